@@ -1,17 +1,73 @@
 from fastapi import FastAPI, Request, HTTPException
-import joblib
+from fastapi.responses import StreamingResponse, Response
+from contextlib import asynccontextmanager
+import asyncio
+import io
+import json
+import time
 import pandas as pd
-from api.schemas import Input_features
+from api.schemas import Input_features, Report_request
+from config import BATCHER_CONFIG, PREDICTION_LOG_CONFIG
+from src.model.batcher import MicroBatcher
+from src.model.hot_swap import ModelHolder
+from src.data_processing.prediction_log import PredictionLogger, copy_predictions, prediction_record
+from src.model.scoring import score_frame, records_to_frame
+from src.explainability.batch import iter_explanations, write_parquet
+from llm.report import build_messages, stream_report_events
 # from src.components.charts import create_clean_shap_dashboard
 import streamlit as st
 
 
-# Load the saved model:
-model = joblib.load("ml/churn_clf_model.pkl")
+# Load the saved model. Requests are encoded with the precomputed FastEncoder and scored
+# either by the fitted sklearn model or by the flat-array copy of the pipeline (PREDICTOR).
+# The holder watches the model file and swaps a new version in without a restart; every
+# request pins the version it started on through model_holder.use():
+model_holder = ModelHolder()
 
+# Number of rows serialized per chunk of the streamed batch response:
+BATCH_CHUNK_SIZE = 1000
 
+# Number of rows explained per TreeExplainer call:
+EXPLAIN_CHUNK_SIZE = 1000
 
-app = FastAPI()
+
+
+def score_records(records):
+    """
+    Scores a micro-batch of Input_features and returns one (label, probability, model version)
+    triple per record.
+    """
+    with model_holder.use() as served:
+        labels, probs = score_frame(served.predictor, [record.model_dump() for record in records])
+    return [(label, prob, served.version) for label, prob in zip(labels.tolist(), probs.tolist())]
+
+
+# Concurrent /predict requests are coalesced into one vectorized call:
+batcher = MicroBatcher(predict_fn=score_records, **BATCHER_CONFIG)
+
+# Every /predict result is buffered and written to the predictions table in the background:
+prediction_logger = None
+if PREDICTION_LOG_CONFIG["enabled"]:
+    log_options = {k: v for k, v in PREDICTION_LOG_CONFIG.items() if k != "enabled"}
+    prediction_logger = PredictionLogger(write_fn=copy_predictions, **log_options)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await batcher.start()
+    model_holder.start()
+    if prediction_logger is not None:
+        prediction_logger.start()
+    yield
+    await batcher.stop()
+    await asyncio.to_thread(model_holder.stop)
+    if prediction_logger is not None:
+        # Flush what is still buffered before the process exits:
+        await asyncio.to_thread(prediction_logger.stop)
+
+
+
+app = FastAPI(lifespan=lifespan)
 @app.get("/")
 def landing_page():
     return "Hello there!!"
@@ -19,16 +75,143 @@ def landing_page():
 
 # Make the prediction:
 @app.post("/predict")
-def predict_churn(input_features:Input_features):
+async def predict_churn(input_features:Input_features):
     try:
-        input_data = pd.DataFrame([input_features.model_dump()])
-        result = model.predict(input_data)
-        pred_prob = model.predict_proba(input_data)
-        pred_prob = pred_prob[0][pred_prob.argmax()]
-        prediction = result.tolist()[0]
-        return {"Prediction": prediction, "Prediction_proba": pred_prob}
+        start = time.perf_counter()
+        prediction, pred_prob, version = await batcher.submit(input_features)
+        if prediction_logger is not None:
+            prediction_logger.log(prediction_record(
+                input_features.model_dump(), prediction, pred_prob, version,
+                (time.perf_counter() - start) * 1000
+            ))
+        return {"Prediction": prediction, "Prediction_proba": pred_prob, "Model_version": version}
     
     except Exception as e:
         return {'error': str(e)}
 
 
+
+# Counters of the prediction log (buffered, written, dropped, write errors):
+@app.get("/predict/log/stats")
+def prediction_log_stats():
+    if prediction_logger is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_logger.stats()}
+
+
+
+# The served model version, its training metadata and the hot-swap counters:
+@app.get("/model")
+def served_model():
+    return model_holder.describe()
+
+
+
+def stream_batch_results(labels, probs, chunk_size):
+    """
+    Yields the batch predictions as newline-delimited JSON, one chunk of rows at a time,
+    so the full response body never has to be built in memory.
+    """
+    for start in range(0, len(labels), chunk_size):
+        chunk_labels = labels[start:start + chunk_size].tolist()
+        chunk_probs = probs[start:start + chunk_size].tolist()
+        yield "".join(
+            json.dumps({"Prediction": label, "Prediction_proba": prob}) + "\n"
+            for label, prob in zip(chunk_labels, chunk_probs)
+        )
+
+
+# Make the predictions for many customers at once:
+@app.post("/predict/batch")
+def predict_churn_batch(input_features:list[Input_features], chunk_size:int = BATCH_CHUNK_SIZE):
+    if not input_features:
+        raise HTTPException(status_code=422, detail="At least one record is required.")
+    if chunk_size < 1:
+        raise HTTPException(status_code=422, detail="chunk_size must be positive.")
+
+    try:
+        start = time.perf_counter()
+        input_data = records_to_frame(input_features)
+        with model_holder.use() as served:
+            labels, probs = score_frame(served.predictor, input_data)
+        if prediction_logger is not None:
+            # Every row is logged with the latency of the whole batch:
+            latency_ms = (time.perf_counter() - start) * 1000
+            for record, label, prob in zip(input_features, labels.tolist(), probs.tolist()):
+                prediction_logger.log(prediction_record(record.model_dump(), label, prob, served.version, latency_ms))
+    except Exception as e:
+        return {'error': str(e)}
+
+    return StreamingResponse(
+        stream_batch_results(labels, probs, chunk_size),
+        media_type="application/x-ndjson",
+        headers={"X-Model-Version": served.version}
+    )
+
+
+
+def stream_batch_explanations(input_data, chunk_size):
+    """
+    Yields the explanations as newline-delimited JSON: a header line with the feature names,
+    the base value and the model version, then one columnar line per chunk. The version is
+    pinned until the last chunk, even if a new one is swapped in meanwhile.
+    """
+    with model_holder.use() as served:
+        explainer_context = served.explainer_context()
+        yield json.dumps({
+            "features": explainer_context.original_features,
+            "base_value": explainer_context.expected_value,
+            "model_version": served.version
+        }) + "\n"
+        for chunk in iter_explanations(explainer_context, input_data, chunk_size):
+            yield json.dumps({
+                "churn_probability": chunk["churn_probability"].tolist(),
+                "agg_shap": chunk["agg_shap"].tolist()
+            }) + "\n"
+
+
+# Explain many customers at once (SHAP values aggregated to the original features):
+@app.post("/explain/batch")
+def explain_churn_batch(input_features:list[Input_features], format:str = "json", chunk_size:int = EXPLAIN_CHUNK_SIZE):
+    if not input_features:
+        raise HTTPException(status_code=422, detail="At least one record is required.")
+    if chunk_size < 1:
+        raise HTTPException(status_code=422, detail="chunk_size must be positive.")
+    if format not in ("json", "parquet"):
+        raise HTTPException(status_code=422, detail="format must be 'json' or 'parquet'.")
+
+    input_data = records_to_frame(input_features)
+    if format == "parquet":
+        try:
+            buffer = io.BytesIO()
+            with model_holder.use() as served:
+                write_parquet(served.explainer_context(), input_data, buffer, chunk_size)
+        except Exception as e:
+            return {'error': str(e)}
+        return Response(content=buffer.getvalue(), media_type="application/vnd.apache.parquet",
+                        headers={"X-Model-Version": served.version})
+
+    return StreamingResponse(
+        stream_batch_explanations(input_data, chunk_size),
+        media_type="application/x-ndjson"
+    )
+
+
+
+# Stream the LLM churn report of one customer as Server-Sent Events:
+@app.post("/report")
+def stream_report(report_request:Report_request):
+    messages = build_messages(
+        shap_values=report_request.shap_values,
+        predictions=report_request.prediction,
+        customer_data=report_request.customer_data,
+        prediction_prob=[report_request.prediction_prob],
+        report_type=report_request.report_type,
+        audience=report_request.audience,
+        include_recommendations=report_request.include_recommendations
+    )
+    return StreamingResponse(
+        stream_report_events(messages),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
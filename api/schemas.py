@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -24,3 +25,15 @@ class Input_features(BaseModel):
     payment_method: str
     monthly_charges: float
     total_charges: float
+
+
+
+# 2. Base model for a churn report request (the inputs of llm/report.py's prompts):
+class Report_request(BaseModel):
+    shap_values: dict[str, float]
+    prediction: str
+    prediction_prob: float
+    customer_data: dict
+    report_type: Optional[str] = None
+    audience: Optional[str] = None
+    include_recommendations: bool = True
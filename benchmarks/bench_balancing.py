@@ -0,0 +1,137 @@
+"""
+Compares the two ways ml/train.py handles the class imbalance on a synthetic customer table
+scaled up from the real one: the notebook's oversampling of the churned customers and
+balanced class weights on the original rows. Each mode runs in a fresh interpreter and goes
+through the same steps as a retrain (balance, encode, cross-validate the served model's
+RandomForest parameters on stratified folds, final fit), reporting training rows, peak
+memory, fit time and scores.
+
+Run from the repository root:
+    python -m benchmarks.bench_balancing
+    python -m benchmarks.bench_balancing --scale 10 --cv-folds 5
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Customers in the real customer table:
+BASE_ROWS = 7043
+
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of its finished children, in MB (Linux)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+
+def run_mode(input_path, balance, cv_folds):
+    """
+    One training run with the given balance; called in the child interpreter. Cross-validation
+    runs in this process (n_jobs=1), so its memory shows up in the peak.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+    from ml.train import (PARAM_DIST_RF, SEED, balanced_fit_params, build_pipeline, classification_metrics,
+                          encode_training_matrix, load_training_data, oversample_minority, spot_check)
+    from src.model.registry import load_model
+
+    served = load_model().named_steps['model'].get_params()
+    params = {key: served[key] for key in PARAM_DIST_RF}
+    X, y, _ = load_training_data(input_path)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=SEED, stratify=y)
+    baseline_mb = peak_rss_mb()
+
+    start = time.perf_counter()
+    if balance == "oversample":
+        X_train, y_train = oversample_minority(X_train, y_train)
+    with tempfile.TemporaryDirectory() as folder:
+        X_encoded, y_encoded = encode_training_matrix(X_train, y_train, folder)
+        matrix_mb = X_encoded.nbytes / 2 ** 20
+        cv = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=7)
+        model = RandomForestClassifier(**params, random_state=SEED, n_jobs=1)
+        cv_result = spot_check([('RF', model)], X_encoded, y_encoded, cv, 1, balance)[0]
+        del X_encoded, y_encoded
+
+    pipeline = build_pipeline(X_train, params)
+    pipeline.named_steps['model'].set_params(n_jobs=1)
+    final_start = time.perf_counter()
+    pipeline.fit(X_train, y_train, **(balanced_fit_params(pipeline, y_train) if balance == "weight" else {}))
+    final_fit_seconds = time.perf_counter() - final_start
+    total_seconds = time.perf_counter() - start
+
+    churn_prob = pipeline.predict_proba(X_test)[:, 1]
+    holdout = classification_metrics(y_test, (churn_prob >= 0.5).astype(int), churn_prob)
+    return {
+        'balance': balance,
+        'training_rows': int(len(X_train)),
+        'matrix_mb': matrix_mb,
+        'baseline_mb': baseline_mb,
+        'peak_mb': peak_rss_mb(),
+        'cv_fit_seconds': cv_result['fit_seconds'],
+        'final_fit_seconds': final_fit_seconds,
+        'total_seconds': total_seconds,
+        'cv_f1': cv_result['f1'],
+        'holdout_f1': holdout['f1'],
+        'holdout_roc_auc': holdout['roc_auc']
+    }
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=10, help=f"synthetic customers, in multiples of {BASE_ROWS}")
+    parser.add_argument("--cv-folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        print(json.dumps(run_mode(args.input, args.mode, args.cv_folds)))
+        return
+
+    from benchmarks.common import synthetic_training_frame
+    from ml.train import BALANCING
+    from src.model.registry import load_model
+
+    n_rows = int(BASE_ROWS * args.scale)
+    with tempfile.TemporaryDirectory() as folder:
+        input_path = os.path.join(folder, "customers.csv")
+        synthetic_training_frame(load_model(), n_rows, seed=args.seed).to_csv(input_path, index=False)
+
+        results = []
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        for balance in BALANCING:
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_balancing", "--mode", balance, "--input", input_path,
+                 "--cv-folds", str(args.cv_folds)],
+                env=env, capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(f"The {balance} run failed:\n{completed.stderr[-2000:]}")
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"{n_rows} synthetic customers ({args.scale:g}x), {args.cv_folds} stratified folds, one process per mode")
+    print(f"{'balance':<12}{'rows':>8}{'matrix MB':>11}{'peak MB':>9}{'+MB':>7}{'cv fit s':>10}{'final s':>9}"
+          f"{'total s':>9}{'cv f1':>8}{'holdout f1':>12}{'roc auc':>9}")
+    for r in results:
+        print(f"{r['balance']:<12}{r['training_rows']:>8}{r['matrix_mb']:>11.1f}{r['peak_mb']:>9.0f}"
+              f"{r['peak_mb'] - r['baseline_mb']:>7.0f}{r['cv_fit_seconds']:>10.1f}{r['final_fit_seconds']:>9.1f}"
+              f"{r['total_seconds']:>9.1f}{r['cv_f1']:>8.4f}{r['holdout_f1']:>12.4f}{r['holdout_roc_auc']:>9.4f}")
+    oversample, weight = (next(r for r in results if r['balance'] == name) for name in ("oversample", "weight"))
+    print(f"weighting: {oversample['total_seconds'] / weight['total_seconds']:.2f}x faster, "
+          f"{oversample['peak_mb'] - oversample['baseline_mb'] - (weight['peak_mb'] - weight['baseline_mb']):.0f} MB "
+          f"less peak memory above the loaded data")
+
+
+if __name__ == "__main__":
+    main()
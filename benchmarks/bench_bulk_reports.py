@@ -0,0 +1,68 @@
+"""
+Runs the bulk report generator against the local fake OpenAI server (with injected 429s)
+and compares its throughput with generating the same reports one at a time.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_reports --customers 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rpm", type=int, default=5000)
+    parser.add_argument("--tpm", type=int, default=10000000)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai import make_app, serve_in_thread
+    fake = make_app(chunk_delay=0.005, first_token_delay=0.2, rate_limit_ratio=args.rate_limit_ratio)
+    server = serve_in_thread(fake, args.port)
+    workdir = tempfile.mkdtemp()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    os.environ["report_cache_path"] = os.path.join(workdir, "report_cache.sqlite")
+
+    from benchmarks.common import synthetic_records
+    from llm.bulk_reports import BulkReportGenerator, customer_report_inputs
+    from llm.report import build_messages
+    from src.model.registry import get_explainer_context
+
+    context = get_explainer_context()
+    data = synthetic_records(context.model, args.customers)
+    jobs = [(f"customer_{i}", build_messages(**inputs, report_type="Action Plan"))
+            for i, inputs in enumerate(customer_report_inputs(data, context))]
+
+    generator = BulkReportGenerator(concurrency=args.concurrency, requests_per_minute=args.rpm,
+                                    tokens_per_minute=args.tpm, base_delay=0.1)
+    start = time.perf_counter()
+    results = asyncio.run(generator.run(jobs, os.path.join(workdir, "reports")))
+    elapsed = time.perf_counter() - start
+    written = sum(path is not None and os.path.exists(path) for path in results.values())
+
+    # One request at a time, as the Generate Report page would do it:
+    one = BulkReportGenerator(concurrency=1, requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    sample = [(name, build_messages(**inputs, report_type="Executive Summary"))
+              for name, inputs in zip(range(5), customer_report_inputs(data.head(5), context))]
+    start = time.perf_counter()
+    asyncio.run(one.run(sample, os.path.join(workdir, "sequential")))
+    sequential = (time.perf_counter() - start) / len(sample)
+
+    print(f"{written}/{len(jobs)} PDFs written in {elapsed:.1f}s ({written / elapsed * 60:.0f} reports/min)")
+    print(f"one at a time: {sequential:.2f}s per report -> {sequential * len(jobs):.1f}s for {len(jobs)} "
+          f"({sequential * len(jobs) / elapsed:.1f}x slower)")
+    print(f"fake server: {fake.state.requests} requests, {fake.state.rate_limited} answered with 429")
+    print(generator.stats)
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
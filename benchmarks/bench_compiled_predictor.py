@@ -0,0 +1,43 @@
+"""
+Compares the compiled flat-array predictor with the sklearn pipeline.
+
+Run from the repository root:
+    python -m benchmarks.bench_compiled_predictor
+"""
+import argparse
+import numpy as np
+from benchmarks.common import synthetic_records, timeit
+from src.model.registry import MODEL_PATH, load_model
+from src.model.compiled import compile_pipeline
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    pipeline = load_model(args.model_path)
+    compiled = compile_pipeline(pipeline)
+    data = synthetic_records(pipeline, args.rows)
+    records = data.to_dict("records")
+
+    max_diff = np.abs(pipeline.predict_proba(data) - compiled.predict_proba(data)).max()
+    print(f"max |sklearn - compiled| over {args.rows} rows: {max_diff:.3e}")
+
+    single_row = data.iloc[[0]]
+    sklearn_single = timeit(lambda: pipeline.predict_proba(single_row), number=100)
+    compiled_single = timeit(lambda: compiled.predict_proba(records[:1]), number=100)
+    sklearn_batch = timeit(lambda: pipeline.predict_proba(data), repeat=3)
+    compiled_batch = timeit(lambda: compiled.predict_proba(data), repeat=3)
+
+    print(f"{'':<22}{'sklearn':>12}{'compiled':>12}{'speedup':>10}")
+    print(f"{'single row (ms)':<22}{sklearn_single * 1e3:>12.3f}{compiled_single * 1e3:>12.3f}"
+          f"{sklearn_single / compiled_single:>9.1f}x")
+    print(f"{f'{args.rows} rows (ms)':<22}{sklearn_batch * 1e3:>12.1f}{compiled_batch * 1e3:>12.1f}"
+          f"{sklearn_batch / compiled_batch:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
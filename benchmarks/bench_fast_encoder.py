@@ -0,0 +1,66 @@
+"""
+Compares the precomputed FastEncoder with the DataFrame + ColumnTransformer path.
+
+Run from the repository root:
+    python -m benchmarks.bench_fast_encoder
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.common import synthetic_records, timeit
+from src.model.registry import MODEL_PATH, load_model
+from src.model.encoder import FastEncoder
+
+
+
+def _dense(X):
+    return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    pipeline = load_model(args.model_path)
+    preprocessor = pipeline.named_steps['preprocessor']
+    final_model = pipeline.named_steps['model']
+    encoder = FastEncoder(preprocessor)
+
+    data = synthetic_records(pipeline, args.rows)
+    records = data.to_dict("records")
+
+    expected = _dense(preprocessor.transform(data))
+    assert np.array_equal(expected, encoder.encode_records(records)), "record path differs from transform"
+    assert np.array_equal(expected, encoder.encode_frame(data)), "frame path differs from transform"
+    print(f"FastEncoder matches preprocessor.transform exactly on {args.rows} rows")
+
+    record = records[0]
+    row = np.zeros(encoder.n_features)
+    matrix = np.zeros((len(records), encoder.n_features))
+    cases = [
+        ("1 record: transform",
+         lambda: preprocessor.transform(pd.DataFrame([record]))),
+        ("1 record: FastEncoder",
+         lambda: encoder.encode_record(record, out=row)),
+        (f"{args.rows} records: transform",
+         lambda: preprocessor.transform(pd.DataFrame(records))),
+        (f"{args.rows} records: FastEncoder",
+         lambda: encoder.encode_records(records, out=matrix)),
+        ("1 record end-to-end: pipeline",
+         lambda: pipeline.predict_proba(pd.DataFrame([record]))),
+        ("1 record end-to-end: FastEncoder + model",
+         lambda: final_model.predict_proba(encoder.encode_record(record)[np.newaxis, :])),
+    ]
+
+    timings = {name: timeit(fn, number=20) for name, fn in cases}
+    for name, seconds in timings.items():
+        print(f"{name:<44}{seconds * 1e6:>12.1f} us")
+    for base, fast in zip(list(timings)[::2], list(timings)[1::2]):
+        print(f"speedup {fast.split(':')[0]:<36}{timings[base] / timings[fast]:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Measures report PDF throughput: the first PDF of a process (which parses the fonts), then
+PDFs/sec rendered in memory and written to disk.
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf --count 200
+The DejaVu TTF files are looked up in the working directory; without them the reports are
+rendered with the built-in Arial font.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+# The canned report of the fake OpenAI server with a few characters the sanitizer has to map:
+REPORT_SUFFIX = "\n“Quoted” advice – with an ellipsis… and a bullet • (© ACME™).\n"
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai import CANNED_REPORT
+    from llm.pdf_generator import dejavu_fonts, render_report_pdf, save_report_as_pdf
+    report = CANNED_REPORT * 3 + REPORT_SUFFIX
+
+    start = time.perf_counter()
+    size = len(render_report_pdf(report).getvalue())
+    first = time.perf_counter() - start
+    try:
+        dejavu_fonts()
+        fonts = "DejaVu"
+    except RuntimeError:
+        fonts = "Arial (DejaVu TTF files not found)"
+
+    start = time.perf_counter()
+    for _ in range(args.count):
+        render_report_pdf(report)
+    in_memory = time.perf_counter() - start
+
+    workdir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    for i in range(args.count):
+        save_report_as_pdf(report, os.path.join(workdir, f"report_{i}.pdf"))
+    to_disk = time.perf_counter() - start
+
+    print(f"font: {fonts}, {size / 1024:.1f} KiB per PDF")
+    print(f"first PDF:  {first * 1000:.1f} ms")
+    print(f"in memory:  {args.count / in_memory:.0f} PDFs/sec ({in_memory / args.count * 1000:.2f} ms each)")
+    print(f"to disk:    {args.count / to_disk:.0f} PDFs/sec ({to_disk / args.count * 1000:.2f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares the verbose and the compact report prompts on a fixed benchmark set: the same
+synthetic customers explained by the saved model, under every report type, audience and
+recommendations option of the Generate Report page. Reports input tokens and build time.
+
+Run from the repository root:
+    python -m benchmarks.bench_prompt_size
+"""
+import argparse
+import time
+
+import pandas as pd
+from benchmarks.common import synthetic_records
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from llm.bulk_reports import customer_report_inputs
+    from llm.report import AUDIENCES, REPORT_TYPES, build_messages, count_tokens, token_encoding
+    from src.model.registry import get_explainer_context
+
+    context = get_explainer_context()
+    customers = customer_report_inputs(synthetic_records(context.model, args.customers, seed=args.seed), context)
+    options = [(report_type, audience, recommendations)
+               for report_type in REPORT_TYPES for audience in AUDIENCES for recommendations in (True, False)]
+
+    totals = {}
+    for compact in (False, True):
+        tokens = 0
+        build_seconds = 0.0
+        for inputs in customers:
+            # The Generate Report page hands over the customer as a one-row DataFrame:
+            inputs = dict(inputs, customer_data=pd.DataFrame([inputs["customer_data"]]))
+            for report_type, audience, recommendations in options:
+                start = time.perf_counter()
+                messages = build_messages(**inputs, report_type=report_type, audience=audience,
+                                          include_recommendations=recommendations, compact=compact)
+                build_seconds += time.perf_counter() - start
+                tokens += count_tokens(messages)
+        totals[compact] = (tokens, build_seconds)
+
+    n_prompts = len(customers) * len(options)
+    if token_encoding() is not None:
+        counter = "tiktoken o200k_base"
+    else:
+        counter = "estimate, 4 chars/token (install tiktoken for exact counts)"
+    print(f"{n_prompts} prompts ({len(customers)} customers x {len(options)} option sets), tokens by {counter}")
+    for compact, label in ((False, "verbose"), (True, "compact")):
+        tokens, build_seconds = totals[compact]
+        print(f"{label:<10}{tokens / n_prompts:>10.0f} tokens/prompt{build_seconds / n_prompts * 1e6:>12.1f} us to build")
+    saved = 1 - totals[True][0] / totals[False][0]
+    print(f"input tokens saved: {saved * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
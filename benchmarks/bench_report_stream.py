@@ -0,0 +1,120 @@
+"""
+Measures time to first token and total time of the streamed report, straight from the
+OpenAI client and through the /report Server-Sent Events endpoint (uncached and from the
+report cache), against the local fake OpenAI server.
+
+Run from the repository root:
+    python -m benchmarks.bench_report_stream
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+
+def read_sse(lines):
+    """
+    Parses Server-Sent Events from an iterator of text lines into (event, data) pairs.
+    """
+    event, data = "message", []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+
+def stream_sse(port, request):
+    """
+    Posts a report request to /report and reads the event stream. Returns the time to first
+    token, the deltas, the server's timing event and the total time.
+    """
+    import httpx
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        start = time.perf_counter()
+        first_token = None
+        deltas = []
+        server_timing = None
+        with client.stream("POST", "/report", json=request) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            for event, data in read_sse(response.iter_lines()):
+                if event == "message":
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                    deltas.append(data["delta"])
+                elif event == "done":
+                    server_timing = data
+                elif event == "error":
+                    raise RuntimeError(data["error"])
+        return first_token, deltas, server_timing, time.perf_counter() - start
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766, help="fake OpenAI port; the API uses the next one")
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    from benchmarks.fake_openai import make_app, serve_in_thread
+    server = serve_in_thread(make_app(args.chunk_delay, args.first_token_delay), args.port)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    os.environ["report_cache_path"] = os.path.join(tempfile.mkdtemp(), "report_cache.sqlite")
+
+    from api.routes import app
+    from llm.report import build_messages, get_openai_client, stream_report_chunks
+    # The API runs under uvicorn, since the test client buffers streamed responses:
+    api_server = serve_in_thread(app, args.port + 1)
+    get_openai_client()
+
+    request = {
+        "shap_values": {"contract": 0.12, "tenure": 0.08, "internet_service": 0.05, "gender": -0.001},
+        "prediction": "Churn",
+        "prediction_prob": 73.4,
+        "customer_data": {"contract": "Month-to-month", "tenure": 3, "internet_service": "Fibre optic"},
+        "report_type": "Executive Summary",
+        "audience": "Management"
+    }
+
+    # Straight from the client:
+    messages = build_messages(request["shap_values"], request["prediction"], request["customer_data"],
+                              [request["prediction_prob"]], request["report_type"], request["audience"])
+    start = time.perf_counter()
+    first_token = None
+    chunks = []
+    for chunk in stream_report_chunks(messages):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        chunks.append(chunk)
+    stream_total = time.perf_counter() - start
+    print(f"{'client stream':<20}ttft {first_token * 1000:8.1f} ms   total {stream_total * 1000:8.1f} ms   {len(chunks)} chunks")
+
+    # Through the SSE endpoint, first for a report that was never generated, then again:
+    request["report_type"] = "Action Plan"
+    for label in ("/report (SSE)", "/report (cached)"):
+        first_token, deltas, server_timing, total = stream_sse(args.port + 1, request)
+        assert "".join(deltas) == "".join(chunks), "SSE stream differs from the client stream"
+        print(f"{label:<20}ttft {first_token * 1000:8.1f} ms   total {total * 1000:8.1f} ms   {len(deltas)} chunks"
+              f"   (server side: ttft {server_timing['ttft_ms']:.1f} ms, total {server_timing['total_ms']:.1f} ms)")
+
+    # Re-render work of the Streamlit page, per chunk versus throttled:
+    from llm.report import RENDER_INTERVAL
+    per_chunk = sum(len("".join(chunks[:i + 1])) for i in range(len(chunks)))
+    renders = max(1, int(stream_total / RENDER_INTERVAL)) + 1
+    print(f"markdown re-renders: {len(chunks)} per chunk ({per_chunk} chars) vs at most {renders} throttled "
+          f"every {RENDER_INTERVAL * 1000:.0f} ms")
+    api_server.should_exit = True
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
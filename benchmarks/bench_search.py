@@ -0,0 +1,59 @@
+"""
+Compares the successive-halving hyper-parameter search of ml/train.py with the exhaustive
+RandomizedSearchCV of the notebook on the same data, folds and seed: search wall time,
+best cv f1 and the holdout scores of each winner.
+
+Run from the repository root:
+    python -m benchmarks.bench_search --input customers.csv
+Without --input a synthetic customer table labelled by the saved model is used.
+"""
+import argparse
+import os
+import tempfile
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV or Parquet export of the customer table")
+    parser.add_argument("--rows", type=int, default=7043, help="synthetic customers when no --input is given")
+    parser.add_argument("--cv-folds", type=int, default=10)
+    parser.add_argument("--n-iter", type=int, default=15)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--factor", type=int, default=3)
+    args = parser.parse_args()
+
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+    from ml.train import SEED, encode_training_matrix, halving_search, holdout_metrics, load_training_data, search_random_forest
+
+    input_path = args.input
+    if input_path is None:
+        from benchmarks.common import synthetic_training_frame
+        from src.model.registry import load_model
+        input_path = os.path.join(tempfile.mkdtemp(), "customers.csv")
+        synthetic_training_frame(load_model(), args.rows, seed=SEED).to_csv(input_path, index=False)
+
+    X, y, _ = load_training_data(input_path)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=SEED, stratify=y)
+    cv = StratifiedKFold(n_splits=args.cv_folds, shuffle=True, random_state=7)
+
+    runs = {}
+    with tempfile.TemporaryDirectory() as folder:
+        X_encoded, y_encoded = encode_training_matrix(X_train, y_train, folder)
+        runs["random"] = search_random_forest(X_encoded, y_encoded, cv, args.n_iter, args.n_jobs)
+        for resource in ("n_samples", "n_estimators"):
+            runs[f"halving/{resource}"] = halving_search(X_encoded, y_encoded, cv, args.n_jobs, n_candidates=args.n_iter,
+                                                         resource=resource, factor=args.factor)
+        del X_encoded, y_encoded
+
+    print(f"{len(X_train)} training rows, {args.cv_folds} folds, {args.n_iter} candidates, seed {SEED}")
+    print(f"{'search':<24}{'seconds':>9}{'speedup':>9}{'cv f1':>8}{'holdout f1':>12}{'roc auc':>9}")
+    baseline = runs["random"][2]["seconds"]
+    for name, (params, cv_f1, info) in runs.items():
+        holdout = holdout_metrics(X_train, y_train, X_test, y_test, params)
+        print(f"{name:<24}{info['seconds']:>9.1f}{baseline / info['seconds']:>8.1f}x{cv_f1:>8.4f}"
+              f"{holdout['f1']:>12.4f}{holdout['roc_auc']:>9.4f}  {params}")
+
+
+if __name__ == "__main__":
+    main()
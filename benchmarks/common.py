@@ -0,0 +1,66 @@
+import time
+import numpy as np
+import pandas as pd
+
+
+# Ranges of the numeric inputs, as allowed by the Predict page:
+NUMERIC_RANGES = {
+    "tenure": (1, 72),
+    "monthly_charges": (18.95, 130.0),
+    "total_charges": (35.0, 7900.0)
+}
+
+
+
+def synthetic_records(pipeline, n_rows, seed=42):
+    """
+    Draws random customers from the categories the fitted preprocessor has seen,
+    in the same column order the model was trained on.
+    """
+    rng = np.random.default_rng(seed)
+    preprocessor = pipeline.named_steps['preprocessor']
+    categories = {}
+    for name, transformer, columns in preprocessor.transformers_:
+        if hasattr(transformer, "categories_"):
+            categories.update(zip(columns, transformer.categories_))
+
+    data = {}
+    for column in preprocessor.feature_names_in_:
+        if column in categories:
+            data[column] = rng.choice(categories[column], n_rows).astype(object)
+        elif column == "tenure":
+            data[column] = rng.integers(*NUMERIC_RANGES[column], n_rows)
+        else:
+            low, high = NUMERIC_RANGES.get(column, (0.0, 1.0))
+            data[column] = np.round(rng.uniform(low, high, n_rows), 2)
+    return pd.DataFrame(data)
+
+
+
+def synthetic_training_frame(pipeline, n_rows, seed=42, churn_rate=0.27):
+    """
+    A customer table to train on: synthetic_records with customer ids and a Yes/No churn
+    label drawn from the model's own churn probability, so there is signal to learn.
+    """
+    rng = np.random.default_rng(seed)
+    data = synthetic_records(pipeline, n_rows, seed=seed)
+    churn_prob = pipeline.predict_proba(data)[:, list(pipeline.classes_).index(1)]
+    # Scale the probabilities so the expected churn rate matches the real table:
+    churned = rng.random(n_rows) < churn_prob * churn_rate / churn_prob.mean()
+    data.insert(0, "customer_id", [f"SYN-{i:07d}" for i in range(n_rows)])
+    data["churn"] = np.where(churned, "Yes", "No")
+    return data
+
+
+
+def timeit(fn, repeat=5, number=1):
+    """
+    Best-of-repeat wall time of number calls, in seconds per call.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
@@ -0,0 +1,132 @@
+"""
+A local OpenAI-compatible chat completions server that streams a canned report, for
+exercising the report streaming without network calls or an API key.
+
+Run from the repository root:
+    python -m benchmarks.fake_openai --port 8766
+and point the client at it with OPENAI_BASE_URL=http://127.0.0.1:8766/v1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+CANNED_REPORT = """# Customer Churn Risk Report
+
+**Prediction**: High Risk (Predicted to Churn)
+
+**Top Drivers**:
+1. contract - Month-to-month contracts increase churn risk by approximately 12%.
+2. tenure - A short tenure increases churn risk by approximately 8%.
+3. internet_service - Fibre optic service increases churn risk by approximately 5%.
+
+**Recommendations**:
+- Offer a discounted one-year contract.
+- Reach out with an onboarding call during the first months.
+"""
+
+
+
+def make_app(chunk_delay=0.01, first_token_delay=0.2, report=CANNED_REPORT, rate_limit_ratio=0.0, seed=0,
+             fail_after=None, retry_after="0.2", reject_marker=None):
+    """
+    A FastAPI app answering POST /v1/chat/completions with the report, streamed word by word
+    or in one response. A rate_limit_ratio share of the requests is answered with a 429
+    (with a Retry-After header unless retry_after is None). With fail_after, a stream sends
+    that many words and then an error event instead of the rest. Requests whose last message
+    contains reject_marker are answered with a 400, which is not worth retrying.
+    """
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.rate_limited = 0
+    rng = random.Random(seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        messages = body.get("messages") or [{}]
+        if reject_marker is not None and reject_marker in messages[-1].get("content", ""):
+            return JSONResponse(
+                status_code=400,
+                content={"error": {"message": "Invalid request", "type": "invalid_request_error", "code": None}}
+            )
+        if rng.random() < rate_limit_ratio:
+            app.state.rate_limited += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": retry_after} if retry_after is not None else {},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            )
+        words = report.split(" ")
+        prompt_tokens = sum(len(message.get("content", "")) for message in body.get("messages", [])) // 4
+
+        async def events():
+            await asyncio.sleep(first_token_delay)
+            for i, word in enumerate(words):
+                if fail_after is not None and i == fail_after:
+                    error = {"error": {"message": "The server had an error while processing your request",
+                                       "type": "server_error"}}
+                    yield f"data: {json.dumps(error)}\n\n"
+                    return
+                chunk = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(chunk_delay)
+            yield "data: [DONE]\n\n"
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_delay + chunk_delay * len(words))
+            return {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": report}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                          "total_tokens": prompt_tokens + len(words)}
+            }
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+
+def serve_in_thread(app, port):
+    """
+    Starts app on 127.0.0.1:port in a daemon thread and returns the uvicorn server once it
+    accepts connections.
+    """
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Fake OpenAI server did not start on port {port}")
+        time.sleep(0.05)
+    return server
+
+
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+    app = make_app(args.chunk_delay, args.first_token_delay, rate_limit_ratio=args.rate_limit_ratio)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
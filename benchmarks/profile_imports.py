@@ -0,0 +1,75 @@
+"""
+Profiles the cold-start imports of the Streamlit app with `python -X importtime` and fails
+when startup goes over budget or when a heavy dependency sneaks back into the Home page.
+
+Run from the repository root:
+    python -m benchmarks.profile_imports
+    python -m benchmarks.profile_imports --module src.navigation_pages.explain --forbid --budget-ms 5000
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+# Dependencies that only the Explain and Generate Report pages need:
+HEAVY_MODULES = ["shap", "matplotlib", "openai", "fpdf", "sklearn"]
+
+
+
+def import_times(module):
+    """
+    Imports module in a fresh interpreter and returns (name, self_us, cumulative_us, depth)
+    for every module it pulled in, in import order.
+    """
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import (default: the Streamlit app)")
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="fail above this total import time")
+    parser.add_argument("--forbid", nargs="*", default=HEAVY_MODULES,
+                        help="top-level packages that must not be imported (pass no names to allow all)")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+
+    print(f"Slowest imports of {args.module} (cumulative):")
+    for name, _, cumulative, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"  {name:<56}{cumulative / 1000:>10.1f} ms")
+    print(f"Total import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    leaked = [name for name in args.forbid if name in imported]
+    if leaked:
+        failures.append(f"imported at startup but should be lazy: {', '.join(leaked)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os 
+import tempfile
 from dotenv  import load_dotenv
 
 load_dotenv(override=True)
@@ -12,3 +13,111 @@ DB_CONFIG = {
     'port': os.getenv("port")
 }
 
+
+# Connection pool used by execute_query (see src/data_processing/database.py):
+DB_POOL_CONFIG = {
+    'minconn': int(os.getenv("db_pool_min", 1)),
+    'maxconn': int(os.getenv("db_pool_max", 10)),
+    'connect_timeout': int(os.getenv("db_connect_timeout", 5)),
+    'checkout_timeout': float(os.getenv("db_pool_checkout_timeout", 30))
+}
+
+# Micro-batching of concurrent /predict requests (see src/model/batcher.py):
+BATCHER_CONFIG = {
+    'max_batch_size': int(os.getenv("predict_max_batch_size", 64)),
+    'max_wait_ms': float(os.getenv("predict_max_wait_ms", 5)),
+    'workers': int(os.getenv("predict_workers", 1))
+}
+
+# Which inference engine the API serves from: "sklearn" (the saved pipeline) or
+# "compiled" (the flat-array copy in src/model/compiled.py):
+PREDICTOR = os.getenv("predictor", "sklearn")
+
+# Shared SHAP explanation cache (see src/explainability/cache.py). Set
+# explanation_cache_path to also keep explanations in a SQLite file:
+EXPLANATION_CACHE_CONFIG = {
+    'max_entries': int(os.getenv("explanation_cache_size", 1024)),
+    'db_path': os.getenv("explanation_cache_path") or None
+}
+
+# How the saved model is loaded (see src/model/registry.py). "r" memory-maps the tree
+# arrays so forked workers share them; set model_mmap_mode to an empty string to copy
+# them onto the heap instead:
+MODEL_MMAP_MODE = os.getenv("model_mmap_mode", "r") or None
+
+# The API watches the model file and swaps in a new version without a restart (see
+# src/model/hot_swap.py). It is checked every model_watch_interval seconds; 0 turns the
+# watcher off:
+MODEL_WATCH_CONFIG = {
+    'poll_interval': float(os.getenv("model_watch_interval", 5))
+}
+
+# Where the Predict page gets its predictions from (see src/model/backends.py):
+# "local" scores in-process, "http" calls the FastAPI service at prediction_api_url and
+# "uvicorn" starts that service on localhost inside the Streamlit process:
+PREDICTION_BACKEND_CONFIG = {
+    'backend': os.getenv("prediction_backend", "http"),
+    'url': os.getenv("prediction_api_url", "https://end-to-end-customer-churn-prediction-8ftp.onrender.com"),
+    'connect_timeout': float(os.getenv("prediction_connect_timeout", 5)),
+    'read_timeout': float(os.getenv("prediction_read_timeout", 60)),
+    'retries': int(os.getenv("prediction_retries", 3)),
+    'uvicorn_port': int(os.getenv("prediction_uvicorn_port", 8765))
+}
+
+# Prediction logging from the API to the predictions table (see
+# src/data_processing/prediction_log.py). Off unless prediction_log_enabled is "true":
+PREDICTION_LOG_CONFIG = {
+    'enabled': os.getenv("prediction_log_enabled", "false").lower() == "true",
+    'capacity': int(os.getenv("prediction_log_capacity", 10000)),
+    'batch_size': int(os.getenv("prediction_log_batch_size", 500)),
+    'flush_interval': float(os.getenv("prediction_log_flush_interval", 1.0))
+}
+
+# Where the Home page's churn distribution comes from (see
+# src/data_processing/churn_summary.py): "csv" (data/churn_distribution.csv) or "db" (the
+# trigger-maintained churn_summary table). It is re-checked at most every ttl seconds:
+CHURN_SUMMARY_CONFIG = {
+    'source': os.getenv("churn_summary_source", "csv"),
+    'ttl': float(os.getenv("churn_summary_ttl", 60))
+}
+
+# On-disk cache of generated LLM reports (see llm/report_cache.py). Set
+# report_cache_enabled to "false" to always call the model:
+REPORT_CACHE_CONFIG = {
+    'enabled': os.getenv("report_cache_enabled", "true").lower() == "true",
+    'db_path': os.getenv("report_cache_path") or os.path.join(tempfile.gettempdir(), "churn_report_cache.sqlite"),
+    'ttl': float(os.getenv("report_cache_ttl", 7 * 24 * 3600)),
+    'max_entries': int(os.getenv("report_cache_max_entries", 5000)),
+    'max_bytes': int(os.getenv("report_cache_max_bytes", 50 * 2**20))
+}
+
+# Bulk report generation (see llm/bulk_reports.py); keep the limits at or below the
+# OpenAI account's rate limits:
+BULK_REPORT_CONFIG = {
+    'concurrency': int(os.getenv("bulk_report_concurrency", 16)),
+    'requests_per_minute': int(os.getenv("openai_rpm", 500)),
+    'tokens_per_minute': int(os.getenv("openai_tpm", 200000)),
+    'max_retries': int(os.getenv("bulk_report_max_retries", 6))
+}
+
+# Report prompts (see llm/report.py): the compact builder sends only the top_k drivers with
+# |SHAP| above shap_threshold; set report_prompt_compact to "false" for the verbose prompts:
+REPORT_PROMPT_CONFIG = {
+    'compact': os.getenv("report_prompt_compact", "true").lower() == "true",
+    'top_k': int(os.getenv("report_prompt_top_k", 8)),
+    'shap_threshold': float(os.getenv("report_prompt_shap_threshold", 0.01))
+}
+
+# Incremental retraining (see ml/retrain.py). Customers added since the served model's
+# watermark (and at least watermark_lag seconds ago) grow the forest by trees_per_batch
+# trees trained on them alone; with retrain_max_trees set, the oldest trees beyond it are
+# retired. The new model is only promoted if its holdout f1 drops by at most max_f1_drop:
+RETRAIN_CONFIG = {
+    'watermark_column': os.getenv("retrain_watermark_column", "added_at"),
+    'watermark_lag': float(os.getenv("retrain_watermark_lag", 300)),
+    'min_rows': int(os.getenv("retrain_min_rows", 500)),
+    'trees_per_batch': int(os.getenv("retrain_trees_per_batch", 50)),
+    'max_trees': int(os.getenv("retrain_max_trees", 0)) or None,
+    'holdout': float(os.getenv("retrain_holdout", 0.2)),
+    'max_f1_drop': float(os.getenv("retrain_max_f1_drop", 0.01))
+}
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+
+import pandas as pd
+from config import BULK_REPORT_CONFIG
+from llm.report import (MODEL, build_messages, cached_report, count_tokens, get_report_cache, openai_api_key,
+                        token_encoding)
+from llm.report_cache import report_key
+from llm.pdf_generator import save_report_as_pdf
+
+
+# Rough size of a generated report, reserved from the tokens/min budget before each call
+# and settled against the real usage afterwards:
+EXPECTED_COMPLETION_TOKENS = 700
+
+logger = logging.getLogger(__name__)
+
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket refilled continuously at rate_per_minute, holding at most one
+    minute's worth. acquire() waits until the requested amount is available; settle() books
+    the difference between an estimate and what was actually used.
+    """
+    def __init__(self, rate_per_minute):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+    async def acquire(self, amount=1.0):
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters in arrival order, so large requests are not starved:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+    def settle(self, delta):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+
+def customer_report_inputs(data, explainer_context):
+    """
+    Explains every customer once and returns the build_messages arguments per customer, in
+    the shape the Explain page hands them to the report.
+    """
+    from src.explainability.batch import explain_batch
+    explanation = explain_batch(explainer_context, data)
+    shap_rows = explainer_context.as_dicts(explanation["agg_shap"])
+    inputs = []
+    for shap_values, churn_probability, customer_data in zip(
+        shap_rows, explanation["churn_probability"].tolist(), data.to_dict("records")
+    ):
+        prediction = "Churn" if churn_probability >= 0.5 else "No Churn"
+        probability = churn_probability if prediction == "Churn" else 1 - churn_probability
+        inputs.append({
+            "shap_values": shap_values,
+            "predictions": prediction,
+            "customer_data": customer_data,
+            "prediction_prob": [probability * 100]
+        })
+    return inputs
+
+
+
+class BulkReportGenerator:
+    """
+    Generates many reports concurrently with AsyncOpenAI. At most `concurrency` requests are
+    in flight, each one first takes its share of the requests/min and tokens/min buckets,
+    and 429s, timeouts and 5xx answers are retried with jittered exponential backoff
+    (honouring Retry-After). Reports already in the report cache are not requested again.
+    """
+    def __init__(self, client=None, concurrency=8, requests_per_minute=500, tokens_per_minute=200000,
+                 max_retries=6, base_delay=1.0, max_delay=60.0):
+        if client is None:
+            from openai import AsyncOpenAI
+            # Retries are handled here, so they share the rate limiter:
+            client = AsyncOpenAI(api_key=openai_api_key(), max_retries=0)
+        self.client = client
+        self.concurrency = concurrency
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {"generated": 0, "cached": 0, "failed": 0, "retries": 0, "rate_limited": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0}
+
+
+    async def generate(self, messages):
+        """Returns the report text for one set of prompt messages."""
+        # The report cache is SQLite, so it is read and written off the event loop:
+        report = await asyncio.to_thread(cached_report, messages)
+        if report is not None:
+            self.stats["cached"] += 1
+            return report
+
+        from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+        estimate = count_tokens(messages) + EXPECTED_COMPLETION_TOKENS
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(estimate)
+            try:
+                response = await self.client.chat.completions.create(model=MODEL, messages=messages)
+            except (RateLimitError, APIConnectionError, APITimeoutError, APIStatusError) as e:
+                retryable = not isinstance(e, APIStatusError) or isinstance(e, RateLimitError) or e.status_code >= 500
+                if not retryable or attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                if isinstance(e, RateLimitError):
+                    self.stats["rate_limited"] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+
+            usage = response.usage
+            if usage is not None:
+                self.token_bucket.settle(usage.total_tokens - estimate)
+                self.stats["prompt_tokens"] += usage.prompt_tokens
+                self.stats["completion_tokens"] += usage.completion_tokens
+            report = response.choices[0].message.content or ""
+            cache = get_report_cache()
+            if cache is not None:
+                await asyncio.to_thread(cache.put, report_key(messages, MODEL), report)
+            self.stats["generated"] += 1
+            return report
+
+
+    def _backoff(self, attempt, error):
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            delay = max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+
+    async def run(self, jobs, output_dir):
+        """
+        Generates a report and a PDF for every (name, messages) job. Returns {name: pdf path
+        or None}; a failed customer does not stop the others.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        if token_encoding() is None:
+            logger.warning("tiktoken is not installed: the tokens/min budget is reserved from prompt sizes "
+                           "estimated at 4 characters per token")
+        slots = asyncio.Semaphore(self.concurrency)
+        results = {}
+
+        async def worker(name, messages):
+            async with slots:
+                try:
+                    report = await self.generate(messages)
+                    # save_report_as_pdf joins the name onto the temp directory, which keeps an
+                    # absolute path as it is. Rendering is CPU work, so it runs off the loop:
+                    pdf_path = os.path.abspath(os.path.join(output_dir, f"{name}.pdf"))
+                    results[name] = await asyncio.to_thread(save_report_as_pdf, report, pdf_path)
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    results[name] = None
+                    logger.warning("Report for %s failed: %s", name, e)
+
+        await asyncio.gather(*(worker(name, messages) for name, messages in jobs))
+        return results
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate retention reports (PDF) for many customers at once.")
+    parser.add_argument("input", help="CSV or Parquet file with one customer per row")
+    parser.add_argument("output_dir", help="directory the PDFs are written to")
+    parser.add_argument("--min-probability", type=float, default=0.0,
+                        help="only report on customers with at least this churn probability")
+    parser.add_argument("--report-type", default="Action Plan")
+    parser.add_argument("--audience", default="Customer Service Team")
+    parser.add_argument("--concurrency", type=int, default=BULK_REPORT_CONFIG["concurrency"])
+    parser.add_argument("--rpm", type=int, default=BULK_REPORT_CONFIG["requests_per_minute"])
+    parser.add_argument("--tpm", type=int, default=BULK_REPORT_CONFIG["tokens_per_minute"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    from src.model.registry import get_explainer_context
+    data = pd.read_parquet(args.input) if args.input.endswith(".parquet") else pd.read_csv(args.input)
+    ids = data.pop("customer_id").astype(str).tolist() if "customer_id" in data.columns else [str(i) for i in data.index]
+    data = data.drop(columns=["churn"], errors="ignore")
+
+    jobs = []
+    for name, inputs in zip(ids, customer_report_inputs(data, get_explainer_context())):
+        churn_probability = inputs["prediction_prob"][0] / 100
+        if inputs["predictions"] != "Churn":
+            churn_probability = 1 - churn_probability
+        if churn_probability < args.min_probability:
+            continue
+        jobs.append((name, build_messages(**inputs, report_type=args.report_type, audience=args.audience)))
+
+    generator = BulkReportGenerator(concurrency=args.concurrency, requests_per_minute=args.rpm,
+                                    tokens_per_minute=args.tpm, max_retries=BULK_REPORT_CONFIG["max_retries"])
+    start = time.perf_counter()
+    results = asyncio.run(generator.run(jobs, args.output_dir))
+    elapsed = time.perf_counter() - start
+    written = sum(path is not None for path in results.values())
+    print(f"Wrote {written}/{len(jobs)} reports to {args.output_dir} in {elapsed:.1f}s "
+          f"({written / elapsed * 60 if elapsed else 0:.0f} reports/min)")
+    print(generator.stats)
+
+
+if __name__ == "__main__":
+    main()
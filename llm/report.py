@@ -1,16 +1,67 @@
+import json
 import os 
-from openai import OpenAI
+import time
+from functools import lru_cache
 from dotenv import load_dotenv
 import streamlit as st
 from datetime import datetime
+from config import REPORT_CACHE_CONFIG, REPORT_PROMPT_CONFIG
+from llm.report_cache import ReportCache, report_key
 
 # Load the dotenv file:
 load_dotenv(override=True)
 
 # OpenAI:
-api_key = st.secrets["OPENAI_API_KEY"]  #loading from Streamlit's secret section
 MODEL = 'gpt-4o-mini'
-openai = OpenAI()
+_client = None
+_report_cache = None
+
+# Minimum seconds between two re-renders of the streamed report in Streamlit:
+RENDER_INTERVAL = 0.1
+
+
+
+def openai_api_key():
+    """
+    The OpenAI key from Streamlit's secrets, or from the environment outside Streamlit (e.g. the API).
+    """
+    try:
+        return st.secrets["OPENAI_API_KEY"]  #loading from Streamlit's secret section
+    except (KeyError, FileNotFoundError):
+        return os.getenv("OPENAI_API_KEY")
+
+
+
+def get_openai_client():
+    """
+    The OpenAI client, created on first use so that importing this module stays cheap.
+    """
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        # OPENAI_BASE_URL, if set, points the client at any OpenAI-compatible server:
+        _client = OpenAI(api_key=openai_api_key())
+    return _client
+
+
+
+def get_report_cache():
+    """
+    The on-disk report cache shared by every session, or None when it is disabled.
+    """
+    global _report_cache
+    if _report_cache is None and REPORT_CACHE_CONFIG["enabled"]:
+        _report_cache = ReportCache(**{k: v for k, v in REPORT_CACHE_CONFIG.items() if k != "enabled"})
+    return _report_cache
+
+
+
+def cached_report(messages):
+    """
+    The previously generated report for exactly these prompts, or None.
+    """
+    cache = get_report_cache()
+    return cache.get(report_key(messages, MODEL)) if cache is not None else None
 
     
 
@@ -205,10 +256,124 @@ def user_prompt(shap_values, predictions, customer_data, prediction_prob,  repor
     return user_prompt
 
 
-def get_report(shap_values, predictions, customer_data, prediction_prob, report_type=None, audience=None, include_recommendations=True):
+# Options offered on the Generate Report page:
+REPORT_TYPES = ["Executive Summary", "Detailed Analysis", "Technical Deep Dive", "Action Plan"]
+AUDIENCES = ["Management", "Customer Service Team", "Technical Team", "Marketing Team"]
+
+
+
+def compact_text(text):
     """
-    A function that generates a streamed report using OpenAI's chat completions.
+    Drops the indentation and blank lines the prompt templates carry, which cost tokens
+    without changing the instructions.
+    """
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+
+# Every system prompt the page can ask for, built once instead of on every call:
+SYSTEM_PROMPTS = {
+    (report_type, audience, include_recommendations): compact_text(
+        system_prompt(report_type, audience, include_recommendations)
+    )
+    for report_type in REPORT_TYPES + [None]
+    for audience in AUDIENCES + [None]
+    for include_recommendations in (True, False)
+}
+
+
+
+def compact_system_prompt(report_type=None, audience=None, include_recommendations=True):
+    """
+    The precomputed, compacted system prompt of one combination of options.
+    """
+    key = (report_type, audience, bool(include_recommendations))
+    if key not in SYSTEM_PROMPTS:
+        SYSTEM_PROMPTS[key] = compact_text(system_prompt(report_type, audience, include_recommendations))
+    return SYSTEM_PROMPTS[key]
+
+
+
+def compact_user_prompt(shap_values, predictions, customer_data, prediction_prob, report_type=None, audience=None,
+                        include_recommendations=True, top_k=REPORT_PROMPT_CONFIG["top_k"],
+                        threshold=REPORT_PROMPT_CONFIG["shap_threshold"]):
+    """
+    The user prompt with only the drivers the report can use: at most top_k features with
+    |SHAP| above threshold, one table row each with the customer's value.
+    """
+    if hasattr(customer_data, "iloc"):
+        customer_data = customer_data.iloc[0].to_dict()
+    churn = predictions == "Churn" or predictions == 1
+    probability = prediction_prob[0]
+
+    drivers = sorted(
+        ((feature, value) for feature, value in shap_values.items() if abs(value) > threshold),
+        key=lambda item: abs(item[1]), reverse=True
+    )[:top_k]
+    rows = "\n".join(
+        f"{feature}|{customer_data.get(feature, '')}|{value:+.3f}" for feature, value in drivers
+    )
+
+    lines = [
+        "Generate a customer churn report.",
+        f"Prediction: {'1 (Will Churn)' if churn else '0 (Will Not Churn)'}, "
+        f"{probability:.2f}% probability of {'churning' if churn else 'staying'}",
+        "Drivers (feature|customer value|SHAP, positive increases churn risk):",
+        rows or "(no feature above the SHAP threshold)",
+        f"{len(shap_values) - len(drivers)} other features omitted (|SHAP| <= {threshold} or beyond the top {top_k}).",
+    ]
+    if report_type:
+        lines.append(f"Report Type: {report_type}")
+    if audience:
+        lines.append(f"Target Audience: {audience}")
+    lines.append("Include actionable recommendations based on the findings." if include_recommendations
+                 else "Do NOT include recommendations in this report.")
+    lines.append("Express SHAP values as percentages (0.05 = 5% impact).")
+    return "\n".join(lines)
+
+
+
+@lru_cache(maxsize=1)
+def token_encoding():
+    """
+    The tokenizer of the report model when tiktoken and its encoding are available, otherwise
+    None. Looked up once per process.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+
+def count_tokens(messages):
+    """
+    Prompt size in tokens: exact with tiktoken when it is installed, otherwise estimated at
+    about four characters per token.
+    """
+    encoding = token_encoding()
+    if encoding is None:
+        return sum(len(message["content"]) for message in messages) // 4 + 4 * len(messages)
+    return sum(len(encoding.encode(message["content"])) + 4 for message in messages)
+
+
+
+def build_messages(shap_values, predictions, customer_data, prediction_prob, report_type=None, audience=None,
+                   include_recommendations=True, compact=REPORT_PROMPT_CONFIG["compact"]):
+    """
+    The system and user messages of one report request; compact=False builds the original,
+    verbose prompts.
     """
+    if compact:
+        return [
+            {"role": "system", "content": compact_system_prompt(report_type, audience, include_recommendations)},
+            {"role": "user", "content": compact_user_prompt(
+                shap_values, predictions, customer_data, prediction_prob,
+                report_type, audience, include_recommendations
+            )}
+        ]
+
     system = system_prompt(
         report_type=report_type, 
         audience=audience, 
@@ -226,25 +391,121 @@ def get_report(shap_values, predictions, customer_data, prediction_prob, report_
         include_recommendations=include_recommendations
     )
     
-    input_data = [
+    return [
         {"role": "system", "content": system},
         {"role": "user", "content": user}
     ]
 
-    report_placeholder = st.empty()
-    full_response = ""
 
-    stream = openai.chat.completions.create(
+
+def stream_report_chunks(messages, client=None):
+    """
+    Yields the text chunks of the report as OpenAI streams them, and caches the full report
+    once the stream is complete.
+    """
+    client = client or get_openai_client()
+    stream = client.chat.completions.create(
         model=MODEL,
-        messages=input_data,
+        messages=messages,
         stream=True
     )
-    
+    chunks = []
     for chunk in stream:
-        if chunk.choices[0].delta.content:
-            full_response += chunk.choices[0].delta.content
-            report_placeholder.markdown(full_response)
-    
-    return full_response
+        if chunk.choices and chunk.choices[0].delta.content:
+            chunks.append(chunk.choices[0].delta.content)
+            yield chunks[-1]
+
+    # Only complete reports are cached; an abandoned stream never gets here:
+    cache = get_report_cache()
+    if cache is not None:
+        cache.put(report_key(messages, MODEL), "".join(chunks))
+
 
 
+def stream_report_events(messages):
+    """
+    Relays the report chunks as Server-Sent Events: one data event per chunk, then a "done"
+    event with the time to first token and the total time (or an "error" event). A cached
+    report is sent as a single data event.
+    """
+    start = time.perf_counter()
+    report = cached_report(messages)
+    if report is not None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        yield f"data: {json.dumps({'delta': report})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'ttft_ms': elapsed_ms, 'total_ms': elapsed_ms, 'chunks': 1, 'cached': True})}\n\n"
+        return
+
+    first_token = None
+    chunks = 0
+    try:
+        for chunk in stream_report_chunks(messages):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            chunks += 1
+            yield f"data: {json.dumps({'delta': chunk})}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        return
+    timing = {
+        "ttft_ms": (first_token or 0.0) * 1000,
+        "total_ms": (time.perf_counter() - start) * 1000,
+        "chunks": chunks,
+        "cached": False
+    }
+    yield f"event: done\ndata: {json.dumps(timing)}\n\n"
+
+
+
+def get_report(shap_values, predictions, customer_data, prediction_prob, report_type=None, audience=None, include_recommendations=True):
+    """
+    A function that generates a streamed report using OpenAI's chat completions.
+
+    A report already generated for the same prompts is served from the report cache.
+    Otherwise chunks are collected in a list and the placeholder is re-rendered at most every
+    RENDER_INTERVAL seconds. Time to first token and total time are kept in
+    st.session_state.report_timing.
+    """
+    input_data = build_messages(
+        shap_values=shap_values,
+        predictions=predictions,
+        customer_data=customer_data,
+        prediction_prob=prediction_prob,
+        report_type=report_type,
+        audience=audience,
+        include_recommendations=include_recommendations
+    )
+
+    report_placeholder = st.empty()
+    start = time.perf_counter()
+
+    # Same prompts as an earlier report: no call to OpenAI at all.
+    full_response = cached_report(input_data)
+    if full_response is not None:
+        report_placeholder.markdown(full_response)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        st.session_state.report_timing = {"ttft_ms": elapsed_ms, "total_ms": elapsed_ms, "chunks": 1, "cached": True}
+        return full_response
+
+    chunks = []
+    first_token = None
+    last_render = 0.0
+
+    for chunk in stream_report_chunks(input_data):
+        chunks.append(chunk)
+        now = time.perf_counter()
+        if first_token is None:
+            first_token = now - start
+        if now - last_render >= RENDER_INTERVAL:
+            report_placeholder.markdown("".join(chunks))
+            last_render = now
+
+    full_response = "".join(chunks)
+    report_placeholder.markdown(full_response)
+    st.session_state.report_timing = {
+        "ttft_ms": (first_token or 0.0) * 1000,
+        "total_ms": (time.perf_counter() - start) * 1000,
+        "chunks": len(chunks),
+        "cached": False
+    }
+    return full_response
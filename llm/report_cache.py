@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from src.data_processing.sqlite_store import sqlite_connection
+
+
+# The date line of user_prompt; it is blanked out of the key so a report stays cached
+# across days (the TTL bounds how stale the date in a cached report can get):
+DATE_LINE = re.compile(r"(Current date:)[^\n]*")
+
+
+
+def report_key(messages, model):
+    """
+    A content address for a report: the hash of the model and the exact prompt messages,
+    with the date line normalized.
+    """
+    normalized = [
+        {"role": message["role"], "content": DATE_LINE.sub(r"\1 <date>", message["content"])}
+        for message in messages
+    ]
+    payload = json.dumps({"model": model, "messages": normalized}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+
+class ReportCache:
+    """
+    Generated reports in a SQLite file, shared by every session and worker process.
+
+    Entries expire ttl seconds after they were generated. The store is bounded by
+    max_entries and max_bytes; past either limit the least recently read reports are
+    evicted first.
+    """
+    def __init__(self, db_path, ttl=7 * 24 * 3600, max_entries=5000, max_bytes=50 * 2**20):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with sqlite_connection(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    key TEXT PRIMARY KEY,
+                    report TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+
+
+    def get(self, key):
+        """Returns the cached report for key, or None if it is missing or expired."""
+        now = time.time()
+        try:
+            with sqlite_connection(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT report FROM reports WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE reports SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            row = None
+        with self._lock:
+            self._counters["hits" if row is not None else "misses"] += 1
+        return row[0] if row is not None else None
+
+
+    def put(self, key, report):
+        """Stores a report, then evicts expired and least recently read entries past the limits."""
+        now = time.time()
+        try:
+            with sqlite_connection(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO reports (key, report, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, report, len(report.encode("utf-8")), now, now)
+                )
+                evicted = conn.execute("DELETE FROM reports WHERE created_at <= ?", (now - self.ttl,)).rowcount
+                evicted += conn.execute("""
+                    DELETE FROM reports WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key,
+                                   ROW_NUMBER() OVER (ORDER BY last_access DESC) AS position,
+                                   SUM(size) OVER (ORDER BY last_access DESC
+                                                   ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) AS running_size
+                            FROM reports
+                        ) WHERE position > ? OR running_size > ?
+                    )
+                """, (self.max_entries, self.max_bytes)).rowcount
+        except sqlite3.Error:
+            # The cache is best-effort; the report has already been delivered.
+            return
+        with self._lock:
+            self._counters["evictions"] += evicted
+
+
+    def stats(self):
+        """Hit/miss/eviction counters and the current size of the store."""
+        with self._lock:
+            stats = dict(self._counters)
+        try:
+            with sqlite_connection(self.db_path) as conn:
+                stats["entries"], stats["bytes"] = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM reports"
+                ).fetchone()
+        except sqlite3.Error:
+            pass
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+    def clear(self):
+        """Drops every cached report."""
+        with sqlite_connection(self.db_path) as conn:
+            conn.execute("DELETE FROM reports")
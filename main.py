@@ -3,19 +3,17 @@ import uuid
 import pandas as pd
 
 from src.navigation_pages.home import home_intro
-from src.navigation_pages.predict import predict
-from src.navigation_pages.explain import explain
-from src.navigation_pages.about import about
-from src.navigation_pages.generate_report import report_generation
 from src.components.charts import display_churn_distribution
+from src.data_processing.churn_summary import get_churn_distribution
+# The other pages are imported when they are opened: Explain pulls in shap and the model,
+# Generate Report pulls in openai and fpdf.
 
 
 
 
 
-# Load the data:
-data = pd.read_csv("data/churn_distribution.csv")
-churn_count = data[data["churn"] == "Yes"]["count"].values
+# Load the data (served from the process-wide cache of the churn summary):
+data = get_churn_distribution()
 
 
 # Navigation section:
@@ -31,7 +29,7 @@ if page == "🏠 Home":
     home_intro()
     st.write("")
     st.subheader("Current Customer Churn Situation:")
-    # data = get_customer_dist_count()  # This is pulled from the datbase but will be used in the future, for now just static CSV file.
+    # Static CSV for now; set churn_summary_source=db to read the trigger-maintained churn_summary table instead.
     table = data.rename(columns={"churn": "Churn", "count": "Total Churn Count"})
     st.write(table)
 
@@ -45,6 +43,7 @@ if page == "🏠 Home":
 
     # To update the chart if new data gets added to the customer table in the DB:
     if st.button("Update Graph"):
+        data = get_churn_distribution(refresh=True)
         chart_key = f"chart_{uuid.uuid4()}"
         with graph_placeholder.container():
             display_churn_distribution(data=data, chart_key=chart_key)
@@ -53,16 +52,20 @@ if page == "🏠 Home":
 
 # 2. Prediction Page:
 if page == "📊 Predict":
+    from src.navigation_pages.predict import predict
     predict()
 
 
 # 3. Explain Page:
 if page == "📖 Explain":
+    from src.navigation_pages.explain import explain
     explain()
 
 if page == "📑 Generate Report":
+    from src.navigation_pages.generate_report import report_generation
     report_generation()
 
 if page == "ℹ️ About":
+    from src.navigation_pages.about import about
     about()
     
\ No newline at end of file
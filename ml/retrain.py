@@ -0,0 +1,212 @@
+"""
+Incrementally retrains the served model on the customers added since it was trained.
+
+Only rows whose watermark column (RETRAIN_CONFIG['watermark_column'], added_at by default)
+is newer than the served model's watermark are read. The forest is warm-started with
+trees_per_batch extra trees fitted on those rows alone, so the cost follows the amount of
+new data rather than the size of the table; with max_trees set, the oldest trees are
+retired so the forest is a sliding window over the most recent batches. The candidate is
+checked against the served model on a holdout of the new rows and only then swapped in.
+
+Run from the repository root, after one full `python -m ml.train`:
+    python -m ml.retrain
+    python -m ml.retrain --input new_customers.csv    # an export instead of the database
+"""
+import argparse
+import copy
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_class_weight
+from config import RETRAIN_CONFIG
+from ml.train import (MODELS_DIR, SEED, classification_metrics, newest_watermark, promote_model, save_version,
+                      split_target, stage)
+from src.model.registry import MODEL_PATH, model_metadata, model_version
+
+
+# Adds the watermark column to customer; existing rows get the time of the migration and
+# new rows the time they are inserted:
+CREATE_WATERMARK_COLUMN = """
+    ALTER TABLE customer ADD COLUMN IF NOT EXISTS {column} TIMESTAMPTZ NOT NULL DEFAULT NOW();
+    CREATE INDEX IF NOT EXISTS customer_{column}_idx ON customer ({column});
+"""
+
+SELECT_NEW_CUSTOMERS = "SELECT * FROM customer WHERE {column} > %s AND {column} <= %s ORDER BY {column};"
+
+logger = logging.getLogger(__name__)
+
+
+
+def create_watermark_column(column=RETRAIN_CONFIG['watermark_column']):
+    """
+    One-off migration that gives the customer table its watermark column and index.
+    """
+    from psycopg2 import sql
+    from src.data_processing.database import get_pool
+    with get_pool().connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL(CREATE_WATERMARK_COLUMN).format(column=sql.Identifier(column)))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+
+def load_new_customers(since, until, column=RETRAIN_CONFIG['watermark_column']):
+    """
+    The customers with since < watermark <= until, oldest first.
+    """
+    from psycopg2 import sql
+    from src.data_processing.database import get_pool
+    query = sql.SQL(SELECT_NEW_CUSTOMERS).format(column=sql.Identifier(column))
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, (since, until))
+            rows = cursor.fetchall()
+            columns = [desc[0] for desc in cursor.description]
+        conn.rollback()
+    return pd.DataFrame(rows, columns=columns)
+
+
+
+def grow_forest(pipeline, X, y, n_new_trees, max_trees=None):
+    """
+    Returns a copy of the pipeline whose forest has n_new_trees more trees, fitted on X, y
+    with warm_start. The existing trees and the fitted encoder are shared with pipeline, not
+    refit or copied. With max_trees, the oldest trees beyond it are dropped.
+    """
+    forest = copy.copy(pipeline.named_steps['model'])
+    forest.estimators_ = list(forest.estimators_)
+    class_weight = forest.class_weight
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + n_new_trees)
+    if class_weight == 'balanced':
+        # Balance the new trees on their own batch, which is what 'balanced' means for them:
+        weights = compute_class_weight('balanced', classes=forest.classes_, y=y)
+        forest.set_params(class_weight=dict(zip(forest.classes_.tolist(), weights)))
+    forest.fit(pipeline.named_steps['preprocessor'].transform(X), y)
+    forest.set_params(class_weight=class_weight)
+
+    if max_trees is not None and len(forest.estimators_) > max_trees:
+        forest.estimators_ = forest.estimators_[-max_trees:]
+    forest.set_params(warm_start=False, n_estimators=len(forest.estimators_))
+
+    grown = copy.copy(pipeline)
+    grown.steps = pipeline.steps[:-1] + [('model', forest)]
+    return grown
+
+
+
+def retrain(input_path=None, model_path=MODEL_PATH, output_dir=MODELS_DIR,
+            trees_per_batch=RETRAIN_CONFIG['trees_per_batch'], max_trees=RETRAIN_CONFIG['max_trees'],
+            min_rows=RETRAIN_CONFIG['min_rows'], promote=True):
+    """
+    Runs one incremental retrain. Returns its metrics, or None when there were too few new
+    customers or the candidate did worse than the served model on the holdout.
+    """
+    timings = {}
+    run_start = time.perf_counter()
+    served = model_metadata(model_path)
+    if not served.get('watermark'):
+        raise RuntimeError(f"{model_path} has no watermark; run a full `python -m ml.train` first")
+    if served.get('content_hash') not in (None, model_version(model_path)):
+        raise RuntimeError(f"The metadata of {model_path} belongs to another model; promote it again")
+
+    with stage("load new customers", timings):
+        if input_path is None:
+            until = datetime.now(timezone.utc) - timedelta(seconds=RETRAIN_CONFIG['watermark_lag'])
+            df = load_new_customers(served['watermark'], until)
+            watermark = until.isoformat()
+        else:
+            df = pd.read_parquet(input_path) if input_path.endswith(".parquet") else pd.read_csv(input_path)
+            column = RETRAIN_CONFIG['watermark_column']
+            if column in df.columns:
+                df = df[pd.to_datetime(df[column]) > pd.Timestamp(served['watermark'])]
+            watermark = newest_watermark(df) or datetime.now(timezone.utc).isoformat()
+    logger.info("%d customers since %s", len(df), served['watermark'])
+    if len(df) < min_rows:
+        logger.info("Fewer than %d new customers, nothing to do", min_rows)
+        return None
+
+    X, y = split_target(df)
+    if len(np.unique(y)) < 2:
+        logger.info("The new customers all have the same churn label, nothing to learn from")
+        return None
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=RETRAIN_CONFIG['holdout'], random_state=SEED, stratify=y
+    )
+
+    with stage("grow forest", timings):
+        current = joblib.load(model_path)
+        candidate = grow_forest(current, X_train, y_train, trees_per_batch, max_trees)
+    forest = candidate.named_steps['model']
+    trees_retired = len(current.named_steps['model'].estimators_) + trees_per_batch - len(forest.estimators_)
+
+    with stage("holdout evaluation", timings):
+        holdout = {}
+        for name, model in (("served", current), ("candidate", candidate)):
+            churn_prob = model.predict_proba(X_test)[:, list(model.classes_).index(1)]
+            holdout[name] = classification_metrics(y_test, (churn_prob >= 0.5).astype(int), churn_prob)
+    logger.info("Holdout f1: served %.4f, candidate %.4f", holdout['served']['f1'], holdout['candidate']['f1'])
+
+    accepted = holdout['candidate']['f1'] >= holdout['served']['f1'] - RETRAIN_CONFIG['max_f1_drop']
+    timings["total"] = time.perf_counter() - run_start
+    metrics = {
+        'version': datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        'kind': 'incremental',
+        'parent_version': served.get('version'),
+        'watermark': watermark,
+        'rows': int(len(X)),
+        'churn_rate': float(y.mean()),
+        'trees': len(forest.estimators_),
+        'trees_added': trees_per_batch,
+        'trees_retired': trees_retired,
+        'holdout': holdout['candidate'],
+        'served_holdout': holdout['served'],
+        'accepted': bool(accepted),
+        'stage_seconds': timings
+    }
+    if not accepted:
+        logger.warning("Candidate rejected: holdout f1 %.4f is more than %.3f below the served model's %.4f",
+                       holdout['candidate']['f1'], RETRAIN_CONFIG['max_f1_drop'], holdout['served']['f1'])
+        return None
+
+    with stage("save", timings):
+        path = save_version(candidate, metrics, output_dir)
+        if promote:
+            promote_model(path, metrics, model_path)
+            logger.info("Promoted %s to %s (%d trees, %d added, %d retired)", path, model_path,
+                        len(forest.estimators_), trees_per_batch, trees_retired)
+    return metrics
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV or Parquet export of the new customers (default: the database)")
+    parser.add_argument("--output-dir", default=MODELS_DIR, help="where versioned models and metrics are written")
+    parser.add_argument("--trees", type=int, default=RETRAIN_CONFIG['trees_per_batch'], help="trees added per run")
+    parser.add_argument("--max-trees", type=int, default=RETRAIN_CONFIG['max_trees'],
+                        help="retire the oldest trees beyond this many (default: keep all)")
+    parser.add_argument("--min-rows", type=int, default=RETRAIN_CONFIG['min_rows'])
+    parser.add_argument("--create-watermark-column", action="store_true",
+                        help="add the watermark column to the customer table and exit")
+    parser.add_argument("--no-promote", action="store_true", help=f"do not replace {MODEL_PATH}")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.create_watermark_column:
+        create_watermark_column()
+        return
+    retrain(input_path=args.input, output_dir=args.output_dir, trees_per_batch=args.trees, max_trees=args.max_trees,
+            min_rows=args.min_rows, promote=not args.no_promote)
+
+
+if __name__ == "__main__":
+    main()
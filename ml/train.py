@@ -0,0 +1,575 @@
+"""
+Retrains the churn model outside the notebook: spot-checks the candidate models of
+"Model experimentation and model building.ipynb" with cross-validation, searches the
+RandomForest hyper-parameters with successive halving, checks the winner on a holdout
+split and saves a versioned pipeline with its metrics next to it.
+
+Cross-validation fits run in parallel worker processes (joblib's loky backend). The encoded
+training matrix is written to a temporary file once and memory-mapped, so every worker
+reads the same pages instead of receiving its own copy.
+
+The class imbalance is handled by weighting (the default): every fit gets balanced class
+weights, through class_weight where the model has it and sample_weight otherwise, and the
+folds are stratified, so no customer is duplicated. --balance oversample reproduces the
+notebook instead, which resamples the churned customers up to the size of the retained ones.
+
+Run from the repository root:
+    python -m ml.train                      # customer table from the database
+    python -m ml.train --input customers.csv
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, parallel_backend
+from scipy.stats import randint
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from sklearn.ensemble import AdaBoostClassifier, ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import ParameterSampler, RandomizedSearchCV, StratifiedKFold, train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.utils import resample
+from sklearn.utils.class_weight import compute_sample_weight
+from sklearn.utils.validation import has_fit_parameter
+from src.data_processing.bulk_scoring import prepare_features
+from config import RETRAIN_CONFIG
+from src.model.registry import MODEL_PATH, metadata_path, model_version
+
+
+MODELS_DIR = "ml/models"
+SEED = 42
+
+# The RandomizedSearchCV space of the notebook:
+PARAM_DIST_RF = {
+    'n_estimators': randint(100, 300),
+    'max_depth': [5, 7, 10, 15, 20, 25],
+    'min_samples_split': randint(10, 20),
+    'min_samples_leaf': randint(4, 15),
+    'class_weight': ['balanced'],
+    'max_features': ['sqrt', 'log2']
+}
+
+# Successive halving grows either the training rows or the trees per forest; the largest
+# forest is the top of the n_estimators range above:
+HALVING_RESOURCE = "n_samples"
+HALVING_MAX_TREES = 300
+
+# How the class imbalance is handled: balanced weights on the original rows, or the
+# notebook's oversampling of the churned customers:
+BALANCING = ("weight", "oversample")
+
+logger = logging.getLogger(__name__)
+
+
+
+def spot_check_models():
+    """
+    The notebook's candidates: plain and standard-scaled baselines, and the tree ensembles.
+    """
+    baselines = [
+        ('LR', LogisticRegression(class_weight='balanced', max_iter=3000)),
+        ('LDA', LinearDiscriminantAnalysis()),
+        ('CART', DecisionTreeClassifier(random_state=SEED)),
+        ('SVM', SVC()),
+        ('NB', GaussianNB()),
+        ('KNN', KNeighborsClassifier())
+    ]
+    models = list(baselines)
+    models += [(f'Scaled{name}', Pipeline([('Scaler', StandardScaler()), (name, clone(model))]))
+               for name, model in baselines]
+    models += [
+        ('AB', AdaBoostClassifier(random_state=SEED)),
+        ('GBM', GradientBoostingClassifier(random_state=SEED)),
+        ('RF', RandomForestClassifier(random_state=SEED)),
+        ('ET', ExtraTreesClassifier(class_weight='balanced', random_state=SEED))
+    ]
+    return models
+
+
+
+def build_preprocessor(categorical_cols):
+    """
+    The one-hot encoding step of the saved pipeline.
+    """
+    return ColumnTransformer(
+        transformers=[
+            ('encoding', OneHotEncoder(handle_unknown='ignore'), categorical_cols)
+        ],
+        remainder='passthrough'
+    )
+
+
+
+def load_training_data(input_path=None):
+    """
+    Loads the customer table (or a CSV/Parquet export of it) and applies the notebook's
+    clean-up. Returns the features, the 0/1 churn target and the newest watermark among the
+    rows (None when the data has no watermark column).
+    """
+    if input_path is None:
+        from src.data_processing.customer_data_access import load_all_data
+        df = load_all_data()
+    elif input_path.endswith(".parquet"):
+        df = pd.read_parquet(input_path)
+    else:
+        df = pd.read_csv(input_path)
+
+    X, y = split_target(df)
+    return X, y, newest_watermark(df)
+
+
+
+def split_target(df):
+    """
+    The model features and the 0/1 churn target of a customer frame.
+    """
+    _, X = prepare_features(df)
+    y = df['churn'].map({"Yes": 1, "No": 0}) if df['churn'].dtype == object else df['churn']
+    return X, y.astype(int).to_numpy()
+
+
+
+def newest_watermark(df, lag=RETRAIN_CONFIG['watermark_lag']):
+    """
+    The largest value of the watermark column as an ISO string, or None without the column.
+    It is capped at lag seconds ago: the column defaults to the inserting transaction's start
+    time, so rows stamped just before the read may still be uncommitted, and the next
+    incremental retrain has to read from before them.
+    """
+    column = RETRAIN_CONFIG['watermark_column']
+    if column not in df.columns or df.empty:
+        return None
+    newest = pd.Timestamp(pd.to_datetime(df[column]).max())
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(seconds=lag)
+    if newest.tzinfo is None:
+        cutoff = cutoff.tz_localize(None)
+    return min(newest, cutoff).isoformat()
+
+
+
+@contextmanager
+def stage(name, timings):
+    """
+    Times one stage of the run, logs it and records it in timings (seconds).
+    """
+    logger.info("%s ...", name)
+    start = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - start
+    logger.info("%s done in %.2fs", name, timings[name])
+
+
+
+def oversample_minority(X, y, seed=SEED):
+    """
+    The notebook's balancing: the minority class is resampled with replacement up to the size
+    of the majority class and the rows are shuffled. The duplicates are real rows, so the
+    training set grows by them, every fit pays for them and a cross-validation fold can hold
+    copies of customers it is validated on.
+    """
+    labels, counts = np.unique(y, return_counts=True)
+    majority = np.flatnonzero(y == labels[np.argmax(counts)])
+    minority = np.flatnonzero(y != labels[np.argmax(counts)])
+    oversampled = resample(minority, replace=True, n_samples=len(majority), random_state=seed)
+    index = np.random.default_rng(seed).permutation(np.concatenate([majority, oversampled]))
+    return X.iloc[index].reset_index(drop=True), y[index]
+
+
+
+def balanced_fit_params(estimator, y):
+    """
+    The fit() arguments that weight the classes of y equally: balanced sample weights for a
+    model (or the model step of a Pipeline) that accepts them. None are needed when it
+    balances itself through class_weight, and none are possible for models without
+    sample_weight (KNN, LDA), which are fitted unweighted.
+    """
+    model = estimator.steps[-1][1] if isinstance(estimator, Pipeline) else estimator
+    if getattr(model, 'class_weight', None) is not None or not has_fit_parameter(model, 'sample_weight'):
+        return {}
+    weights = compute_sample_weight('balanced', y)
+    if isinstance(estimator, Pipeline):
+        return {f"{estimator.steps[-1][0]}__sample_weight": weights}
+    return {'sample_weight': weights}
+
+
+
+def memmap_array(array, folder, name):
+    """
+    Dumps array into folder and returns it memory-mapped read-only. joblib hands a memmap to
+    worker processes by file name, so they all share it through the page cache.
+    """
+    path = os.path.join(folder, f"{name}.joblib")
+    joblib.dump(np.ascontiguousarray(array), path)
+    return joblib.load(path, mmap_mode='r')
+
+
+
+def classification_metrics(y_true, y_pred, y_score=None):
+    """
+    The notebook's scores, plus ROC AUC when scores are available.
+    """
+    metrics = {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'precision': precision_score(y_true, y_pred, zero_division=0),
+        'recall': recall_score(y_true, y_pred),
+        'f1': f1_score(y_true, y_pred)
+    }
+    if y_score is not None:
+        metrics['roc_auc'] = roc_auc_score(y_true, y_score)
+    return metrics
+
+
+
+def _fit_and_score(name, estimator, X, y, train, test, balance="weight"):
+    """
+    One cross-validation fold of one candidate; runs inside a worker process. With
+    balance="weight" the classes of the training fold are weighted equally.
+    """
+    fit_params = balanced_fit_params(estimator, y[train]) if balance == "weight" else {}
+    start = time.perf_counter()
+    estimator.fit(X[train], y[train], **fit_params)
+    fit_seconds = time.perf_counter() - start
+    scores = classification_metrics(y[test], estimator.predict(X[test]))
+    return name, scores, fit_seconds
+
+
+
+def spot_check(models, X, y, cv, n_jobs, balance="weight"):
+    """
+    Cross-validates every candidate. The (candidate, fold) fits are spread over the workers
+    individually, so one slow model does not hold back a whole worker. Returns one row of
+    mean scores per candidate, best f1 first.
+    """
+    folds = list(cv.split(X, y))
+    results = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(_fit_and_score)(name, clone(model), X, y, train, test, balance)
+        for name, model in models for train, test in folds
+    )
+
+    rows = []
+    for name, _ in models:
+        fold_scores = [scores for model_name, scores, _ in results if model_name == name]
+        row = {'name': name}
+        for metric in fold_scores[0]:
+            row[metric] = float(np.mean([scores[metric] for scores in fold_scores]))
+        row['fit_seconds'] = float(sum(seconds for model_name, _, seconds in results if model_name == name))
+        rows.append(row)
+        logger.info("%s: Mean Accuracy: %.4f, Precision: %.4f, Recall: %.4f, F1 Score: %.4f",
+                    name, row['accuracy'], row['precision'], row['recall'], row['f1'])
+    return sorted(rows, key=lambda row: row['f1'], reverse=True)
+
+
+
+def search_random_forest(X, y, cv, n_iter, n_jobs):
+    """
+    The notebook's RandomizedSearchCV over RandomForest, with the candidate fits spread over
+    worker processes (the forests themselves stay single-threaded). Every candidate gets the
+    full cross-validation.
+    """
+    start = time.perf_counter()
+    search = RandomizedSearchCV(
+        estimator=RandomForestClassifier(random_state=SEED, n_jobs=1),
+        param_distributions=PARAM_DIST_RF,
+        n_iter=n_iter, scoring='f1', cv=cv, random_state=SEED, n_jobs=n_jobs, refit=False
+    )
+    with parallel_backend("loky"):
+        search.fit(X, y)
+    info = {'strategy': 'random', 'candidates': n_iter, 'seconds': time.perf_counter() - start}
+    return search.best_params_, float(search.best_score_), info
+
+
+
+def halving_search(X, y, cv, n_jobs, n_candidates=15, resource=HALVING_RESOURCE, factor=3, time_budget=None,
+                   balance="weight"):
+    """
+    Successive halving over PARAM_DIST_RF, in the manner of HalvingRandomSearchCV. All the
+    sampled candidates (the same ones RandomizedSearchCV draws for this seed) are first
+    cross-validated on a small resource; only the best 1/factor of them move on to the next
+    rung, with factor times the resource, and the last rung runs at the full resource.
+
+    resource is "n_samples" (a nested subsample of every training fold; the validation folds
+    are always complete) or "n_estimators" (trees per forest, up to HALVING_MAX_TREES; the
+    sampled n_estimators is then ignored). With time_budget (seconds) no rung after the first
+    is started if its projected duration would overrun the budget; the best candidate of the
+    last finished rung wins.
+
+    Returns the best parameters, their mean cv f1 on the last rung and a per-rung summary.
+    """
+    if resource not in ("n_samples", "n_estimators"):
+        raise ValueError(f"Unknown resource '{resource}', expected 'n_samples' or 'n_estimators'")
+    start = time.perf_counter()
+    folds = list(cv.split(X, y))
+    distributions = dict(PARAM_DIST_RF)
+    if resource == "n_estimators":
+        del distributions['n_estimators']
+        max_resource = HALVING_MAX_TREES
+    else:
+        max_resource = min(len(train) for train, _ in folds)
+        # Each rung trains on a prefix of the same shuffled fold, so survivors see more data:
+        rng = np.random.default_rng(SEED)
+        folds = [(rng.permutation(train), test) for train, test in folds]
+
+    n_rungs, remaining = 1, n_candidates
+    while remaining > factor:
+        remaining = -(-remaining // factor)
+        n_rungs += 1
+    min_resource = max(1, max_resource // factor ** (n_rungs - 1))
+
+    candidates = list(ParameterSampler(distributions, n_candidates, random_state=SEED))
+    rungs = []
+    stopped_by_budget = False
+    for rung in range(n_rungs):
+        n_resource = max_resource if rung == n_rungs - 1 else min_resource * factor ** rung
+        if time_budget is not None and rungs:
+            last = rungs[-1]
+            projected = last['seconds'] * len(candidates) / last['candidates'] * n_resource / last['resource']
+            if time.perf_counter() - start + projected > time_budget:
+                stopped_by_budget = True
+                logger.info("Time budget of %.0fs reached, stopping before rung %d", time_budget, rung)
+                break
+
+        rung_start = time.perf_counter()
+        tasks = []
+        for i, params in enumerate(candidates):
+            if resource == "n_estimators":
+                params = dict(params, n_estimators=n_resource)
+            estimator = RandomForestClassifier(**params, random_state=SEED, n_jobs=1)
+            for train, test in folds:
+                if resource == "n_samples":
+                    train = np.sort(train[:n_resource])
+                tasks.append(delayed(_fit_and_score)(i, clone(estimator), X, y, train, test, balance))
+        results = Parallel(n_jobs=n_jobs, backend="loky")(tasks)
+
+        f1 = np.zeros(len(candidates))
+        for i, scores, _ in results:
+            f1[i] += scores['f1'] / len(folds)
+        order = np.argsort(-f1, kind="stable")
+        best_params, best_score = candidates[order[0]], float(f1[order[0]])
+        rungs.append({'resource': int(n_resource), 'candidates': len(candidates), 'best_f1': best_score,
+                      'seconds': time.perf_counter() - rung_start})
+        logger.info("Rung %d: %d candidates at %s=%d, best f1 %.4f (%.1fs)", rung, len(candidates),
+                    resource, n_resource, best_score, rungs[-1]['seconds'])
+        candidates = [candidates[i] for i in order[:-(-len(candidates) // factor)]]
+
+    if resource == "n_estimators":
+        # The winner is refit with the full forest, whichever rung it was chosen on:
+        best_params = dict(best_params, n_estimators=max_resource)
+    info = {'strategy': 'halving', 'resource': resource, 'factor': factor, 'candidates': n_candidates,
+            'time_budget': time_budget, 'stopped_by_budget': stopped_by_budget, 'rungs': rungs,
+            'seconds': time.perf_counter() - start}
+    return best_params, best_score, info
+
+
+
+def encode_training_matrix(X_train, y_train, folder):
+    """
+    One-hot encodes the training split once and returns it (and the target) memory-mapped
+    from folder, ready to be shared with the worker processes.
+    """
+    preprocessor = build_preprocessor(X_train.select_dtypes(include='object').columns.to_list())
+    encoded = preprocessor.fit_transform(X_train)
+    X_encoded = memmap_array(encoded.toarray() if hasattr(encoded, "toarray") else encoded, folder, "X_train")
+    return X_encoded, memmap_array(y_train, folder, "y_train")
+
+
+
+def holdout_metrics(X_train, y_train, X_test, y_test, params, balance="weight"):
+    """
+    Fits the pipeline with params on the training split and scores it on the holdout split.
+    """
+    pipeline = build_pipeline(X_train, params)
+    pipeline.fit(X_train, y_train, **(balanced_fit_params(pipeline, y_train) if balance == "weight" else {}))
+    churn_prob = pipeline.predict_proba(X_test)[:, 1]
+    return classification_metrics(y_test, (churn_prob >= 0.5).astype(int), churn_prob)
+
+
+
+def build_pipeline(X, params):
+    """
+    The saved model: one-hot encoding followed by a RandomForest with the given parameters.
+    """
+    categorical_cols = X.select_dtypes(include='object').columns.to_list()
+    return Pipeline([
+        ('preprocessor', build_preprocessor(categorical_cols)),
+        ('model', RandomForestClassifier(**params, random_state=SEED, n_jobs=-1))
+    ])
+
+
+
+def save_model(pipeline, path):
+    """
+    Dumps the pipeline uncompressed (so the registry can memory-map it) through a temporary
+    file and an atomic rename; readers never see a half-written model.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(pipeline, tmp_path)
+    os.replace(tmp_path, path)
+
+
+
+def save_version(pipeline, metrics, output_dir=MODELS_DIR):
+    """
+    Writes churn_clf_model_<version>.pkl and its .metrics.json into output_dir and returns
+    the model path. metrics must carry the version; the model file and its content hash are
+    added to it.
+    """
+    path = os.path.join(output_dir, f"churn_clf_model_{metrics['version']}.pkl")
+    save_model(pipeline, path)
+    metrics.update({'model_file': path, 'content_hash': model_version(path)})
+    with open(os.path.join(output_dir, f"churn_clf_model_{metrics['version']}.metrics.json"), "w") as f:
+        json.dump(metrics, f, indent=2)
+    return path
+
+
+
+def promote_model(path, metrics, model_path=MODEL_PATH):
+    """
+    Makes a saved model the one the app serves by atomically replacing model_path. Its
+    metrics become the metadata file next to it (see registry.model_metadata). The metadata
+    is replaced first: it carries the content hash of the new model, so until the model
+    follows, readers can tell it does not describe the model they loaded (see hot_swap), and
+    a watcher never pairs the new model with the old metadata.
+    """
+    tmp_path = f"{metadata_path(model_path)}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metrics, f, indent=2)
+    os.replace(tmp_path, metadata_path(model_path))
+
+    tmp_path = f"{model_path}.tmp"
+    shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, model_path)
+
+
+
+def train(input_path=None, output_dir=MODELS_DIR, cv_folds=10, n_iter=15, n_jobs=-1, promote=True,
+          model_path=MODEL_PATH, search="halving", resource=HALVING_RESOURCE, factor=3, time_budget=None,
+          balance="weight"):
+    """
+    Runs the whole retrain and returns the metrics written next to the saved model. search
+    is "halving" (successive halving over n_iter candidates, see halving_search) or "random"
+    (the notebook's exhaustive RandomizedSearchCV). balance is "weight" or "oversample" (see
+    BALANCING); the holdout split is never oversampled.
+    """
+    if balance not in BALANCING:
+        raise ValueError(f"Unknown balance '{balance}', expected 'weight' or 'oversample'")
+    timings = {}
+    run_start = time.perf_counter()
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    with stage("load data", timings):
+        X, y, watermark = load_training_data(input_path)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=SEED, stratify=y)
+    logger.info("%d customers (%.1f%% churned), %d for training", len(X), y.mean() * 100, len(X_train))
+    if balance == "oversample":
+        with stage("oversample", timings):
+            X_train, y_train = oversample_minority(X_train, y_train)
+        logger.info("%d training rows after oversampling", len(X_train))
+
+    with tempfile.TemporaryDirectory(prefix="churn_train_") as folder:
+        with stage("encode", timings):
+            X_encoded, y_encoded = encode_training_matrix(X_train, y_train, folder)
+
+        cv = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=7)
+        with stage("spot-check", timings):
+            spot_check_results = spot_check(spot_check_models(), X_encoded, y_encoded, cv, n_jobs, balance)
+        with stage("hyper-parameter search", timings):
+            if search == "halving":
+                best_params, best_cv_f1, search_info = halving_search(
+                    X_encoded, y_encoded, cv, n_jobs, n_candidates=n_iter, resource=resource, factor=factor,
+                    time_budget=time_budget, balance=balance
+                )
+            elif search == "random":
+                best_params, best_cv_f1, search_info = search_random_forest(X_encoded, y_encoded, cv, n_iter, n_jobs)
+            else:
+                raise ValueError(f"Unknown search '{search}', expected 'halving' or 'random'")
+        logger.info("Best parameters found: %s (cv f1 %.4f)", best_params, best_cv_f1)
+        del X_encoded, y_encoded
+
+    with stage("holdout evaluation", timings):
+        holdout = holdout_metrics(X_train, y_train, X_test, y_test, best_params, balance)
+    logger.info("Holdout: %s", ", ".join(f"{metric} {value:.4f}" for metric, value in holdout.items()))
+
+    with stage("final fit", timings):
+        pipeline = build_pipeline(X, best_params)
+        if balance == "oversample":
+            pipeline.fit(*oversample_minority(X, y))
+        else:
+            pipeline.fit(X, y, **balanced_fit_params(pipeline, y))
+        # Serve single-threaded, like the model the notebook saved:
+        pipeline.named_steps['model'].set_params(n_jobs=None)
+
+    with stage("save", timings):
+        timings["total"] = time.perf_counter() - run_start
+        metrics = {
+            'version': version,
+            'kind': 'full',
+            'watermark': watermark,
+            'rows': int(len(X)),
+            'churn_rate': float(y.mean()),
+            'balance': balance,
+            'training_rows': int(len(X_train)),
+            'cv_folds': cv_folds,
+            'n_jobs': n_jobs,
+            'spot_check': spot_check_results,
+            'best_params': {key: value.item() if hasattr(value, "item") else value
+                            for key, value in best_params.items()},
+            'best_cv_f1': best_cv_f1,
+            'search': search_info,
+            'holdout': holdout,
+            'stage_seconds': timings
+        }
+        path = save_version(pipeline, metrics, output_dir)
+        if promote:
+            promote_model(path, metrics, model_path)
+            logger.info("Promoted %s to %s", path, model_path)
+
+    logger.info("Retrain finished in %.1fs: %s", timings["total"],
+                ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items() if name != "total"))
+    return metrics
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="CSV or Parquet export of the customer table (default: the database)")
+    parser.add_argument("--output-dir", default=MODELS_DIR, help="where versioned models and metrics are written")
+    parser.add_argument("--cv-folds", type=int, default=10)
+    parser.add_argument("--search", choices=["halving", "random"], default="halving",
+                        help="successive halving, or the exhaustive RandomizedSearchCV of the notebook")
+    parser.add_argument("--n-iter", type=int, default=15, help="hyper-parameter candidates")
+    parser.add_argument("--resource", choices=["n_samples", "n_estimators"], default=HALVING_RESOURCE,
+                        help="what successive halving grows between rungs")
+    parser.add_argument("--factor", type=int, default=3, help="successive halving keeps 1/factor per rung")
+    parser.add_argument("--time-budget", type=float, help="seconds the successive halving may take")
+    parser.add_argument("--balance", choices=BALANCING, default="weight",
+                        help="balanced class weights, or the notebook's oversampling of the churned customers")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="worker processes (-1: one per core)")
+    parser.add_argument("--no-promote", action="store_true", help=f"do not replace {MODEL_PATH}")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    train(input_path=args.input, output_dir=args.output_dir, cv_folds=args.cv_folds, n_iter=args.n_iter,
+          n_jobs=args.n_jobs, promote=not args.no_promote, search=args.search, resource=args.resource,
+          factor=args.factor, time_budget=args.time_budget, balance=args.balance)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,10 @@
-import plotly.express as px
-from src.data_processing.customer_data_access import  load_all_data, get_churn_count
+from src.data_processing.churn_summary import get_baseline_churn_rate
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import shap
-from matplotlib.colors import LinearSegmentedColormap
 import numpy as np
-
-
-# Load the data (DB queries are replaced by a CSV file:):
-data = pd.read_csv("data/churn_distribution.csv")
-churn_count = data[data["churn"] == "Yes"]["count"].values
-
-total_churn_count = churn_count[0]
-# total_churn_count = get_churn_count()
-
-
-total_customers =  data["count"].sum()
-# total_customers = len(load_all_data())
-
-baseline_churn_rate = (total_churn_count / total_customers) * 100
+import io
+# plotly, matplotlib and shap (through the explainer) are imported inside the functions that
+# draw with them, so pages that never show those charts don't pay for the imports.
 
 
 contract_mapping = {
@@ -33,6 +18,8 @@ def display_churn_distribution(data, chart_key):
     """
     This function is responsible fetching the data from database and displaying the bar chart for churn and non-churn.
     """
+    import plotly.express as px
+
     data = data
     custom_colors = {'Yes': '#b11346', 'No': '#0e7337'}
     st.write("")
@@ -47,12 +34,12 @@ def display_churn_distribution(data, chart_key):
 
 
 def display_customer_health_dashboard(res, input_features):
-    """Displays the customer health dashboard based on the prediction"""
+    """Displays the customer health dashboard based on the prediction result (the /predict response body)"""
 
 
-    prediction_prob = res.json()['Prediction_proba'] * 100
-    delta_precentage = abs(baseline_churn_rate - prediction_prob)
-    prediction = res.json()['Prediction']
+    prediction_prob = res['Prediction_proba'] * 100
+    delta_precentage = abs(get_baseline_churn_rate() - prediction_prob)
+    prediction = res['Prediction']
     st.subheader("Customer Health Dashboard")
     
     m1, m2, m3 = st.columns(3)
@@ -85,104 +72,33 @@ def display_customer_health_dashboard(res, input_features):
 
 
 
-def create_clean_shap_dashboard(customer_data, model, background_data=None):
+def create_clean_shap_dashboard(customer_data, model, background_data=None, explainer_context=None):
     """
     Creates a clean two-row SHAP dashboard:
     - Top row: SHAP impact chart (without values on bars)
     - Bottom row: Feature values table
+
+    Prefer compute_explanation plus render_shap_dashboard when the figure is only needed for display.
     """
-    
+    from src.explainability.explainer import compute_explanation
 
-    # ====================== [1. SHAP CALCULATIONS] ======================
-    # Extract model components
-    final_model = model.named_steps['model']
-    preprocessor = model.named_steps['preprocessor']
+    result = compute_explanation(customer_data, model, background_data=background_data,
+                                 explainer_context=explainer_context)
+    result["plot"] = build_shap_figure(result["agg_shap"], result["customer_values"],
+                                       result["prediction"], result["churn_probability"])
+    return result
+
+
+
+def build_shap_figure(aggregated_shap, customer_values, prediction, churn_probability):
+    """
+    Builds the two-row SHAP dashboard figure from already computed explanation values:
+    - Top row: SHAP impact chart (without values on bars)
+    - Bottom row: Feature values table
+    """
+    from matplotlib.colors import LinearSegmentedColormap
+    from matplotlib.figure import Figure
 
-    if isinstance(customer_data, dict):
-        customer_df = pd.DataFrame([customer_data])
-    else:
-        customer_df = customer_data
-    
-    # Transform customer data
-    X_transformed = preprocessor.transform(customer_df)
-    if hasattr(X_transformed, "toarray"):
-        X_transformed = X_transformed.toarray()
-    
-    # Get feature names
-    if hasattr(preprocessor, 'get_feature_names_out'):
-        feature_names = preprocessor.get_feature_names_out()
-    else:
-        feature_names = [f"feature_{i}" for i in range(X_transformed.shape[1])]
-    
-    # Create explainer
-    if hasattr(final_model, 'predict_proba'):
-        if hasattr(final_model, 'estimators_'):
-            explainer = shap.TreeExplainer(final_model)
-        elif hasattr(final_model, 'coef_'):
-            explainer = shap.LinearExplainer(final_model, X_transformed)
-        else:
-            if background_data is not None:
-                X_background = preprocessor.transform(background_data)
-                if hasattr(X_background, "toarray"):
-                    X_background = X_background.toarray()
-                explainer = shap.KernelExplainer(final_model.predict_proba, X_background)
-            else:
-                explainer = shap.Explainer(final_model, X_transformed, feature_names=feature_names)
-    else:
-        explainer = shap.Explainer(final_model, X_transformed, feature_names=feature_names)
-    
-    # Get SHAP values
-    if isinstance(explainer, shap.KernelExplainer):
-        shap_values = explainer.shap_values(X_transformed)
-        if isinstance(shap_values, list) and len(shap_values) > 1:
-            shap_for_churn = shap_values[1] 
-        else:
-            shap_for_churn = shap_values
-        base_value = explainer.expected_value
-        if isinstance(base_value, list) and len(base_value) > 1:
-            base_value = base_value[1]
-    else:
-        shap_values = explainer(X_transformed)
-        if len(shap_values.shape) > 2 and shap_values.shape[2] > 1:
-            shap_for_churn = shap_values[:, :, 1].values
-            base_value = shap_values[0, :, 1].base_values
-        else:
-            shap_for_churn = shap_values.values
-            base_value = shap_values.base_values
-    
-    # Feature mapping
-    original_features = customer_df.columns.tolist()
-    
-    feature_mapping = {}
-    for i, feature_name in enumerate(feature_names):
-        parts = feature_name.split('__')
-        if feature_name.startswith('encoding__') and len(parts) >= 2:
-            full_feature = parts[1]
-            for orig_feature in original_features:
-                if full_feature.startswith(orig_feature):
-                    feature_mapping[i] = orig_feature
-                    break
-            else:
-                feature_mapping[i] = '_'.join(full_feature.split('_')[:-1])
-        elif feature_name.startswith('remainder__') and len(parts) >= 2:
-            feature_mapping[i] = parts[1]
-        else:
-            feature_mapping[i] = feature_name
-    
-    # Aggregate SHAP values
-    aggregated_shap = {}
-    for i, shap_value in enumerate(shap_for_churn[0]):
-        original_feature = feature_mapping.get(i)
-        if original_feature not in aggregated_shap:
-            aggregated_shap[original_feature] = 0
-        aggregated_shap[original_feature] += shap_value
-    
-    # Get customer values
-    customer_values = {}
-    for feature in original_features:
-        if feature in customer_df.columns:
-            customer_values[feature] = str(customer_df.iloc[0][feature])
-    
     # Sort features by absolute impact
     sorted_features = sorted(aggregated_shap.keys(), 
                            key=lambda x: abs(aggregated_shap[x]), 
@@ -190,9 +106,9 @@ def create_clean_shap_dashboard(customer_data, model, background_data=None):
     sorted_values = [aggregated_shap[f] for f in sorted_features]
     
     
-    # ====================== [2. VISUALIZATION] ======================
-    # Create figure with two rows
-    fig = plt.figure(figsize=(18, 14))
+    # Create figure with two rows (a bare Figure is not tracked by pyplot, so nothing leaks
+    # once the caller drops it)
+    fig = Figure(figsize=(18, 14))
     gs = fig.add_gridspec(2, 1, height_ratios=[2, 1], hspace=0.4)
     
     # ===== TOP ROW: CLEAN SHAP CHART (NO VALUES ON BARS) =====
@@ -248,30 +164,36 @@ def create_clean_shap_dashboard(customer_data, model, background_data=None):
             cell.set_facecolor('#f7f7f7')
     
     # ===== PREDICTION TITLE =====
-    prediction = model.predict(customer_df)[0]
-    prediction_proba = model.predict_proba(customer_df)[0][1]
+    is_churn = prediction == "Churn"
     fig.suptitle(
     f"Customer Churn Analysis "
-    f"Prediction: {'Churn' if prediction == 1 else 'No Churn'} "
-    f"(Probability: {(prediction_proba if prediction == 1 else (1 - prediction_proba)) * 100:.2f}% chance the customer will "
-    f"{'leave' if prediction == 1 else 'stay'}) \n",
+    f"Prediction: {'Churn' if is_churn else 'No Churn'} "
+    f"(Probability: {(churn_probability if is_churn else (1 - churn_probability)) * 100:.2f}% chance the customer will "
+    f"{'leave' if is_churn else 'stay'}) \n",
     fontsize=16, y=0.98
 )
     
     # Final layout adjustment
 
-    plt.subplots_adjust(top=0.94)  # Adjust top spacing
+    fig.subplots_adjust(top=0.94)  # Adjust top spacing
     
-    
-    return {
-        "prediction": "Churn" if prediction == 1 else "No Churn",
-        "churn_probability": float(prediction_proba),
-        "plot": fig,
-        "base_value": float(base_value),
-        "shap_values": shap_values,
-        "agg_shap": aggregated_shap,
-        "customer_data" : customer_df
-    }
+    return fig
+
+
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_shap_dashboard(explanation_key, _explanation, image_format="png"):
+    """
+    Renders the SHAP dashboard of an explanation to PNG or SVG bytes. Only the explanation
+    key and the format are hashed, so the same explanation is rendered once per process.
+    """
+    fig = build_shap_figure(_explanation["agg_shap"], _explanation["customer_values"],
+                            _explanation["prediction"], _explanation["churn_probability"])
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, dpi=100, bbox_inches="tight")
+    fig.clear()
+    return buffer.getvalue()
 
 
 
@@ -280,6 +202,8 @@ def show_shap_top_features():
     """
     This function takes in the number of features that the user wants to see for the SHAP and shows the table and the chart.
     """
+    import plotly.express as px
+
     shap_values = st.session_state.shap_values # session from explain.py
     input_features = st.session_state.input_features
     combined = {
@@ -0,0 +1,202 @@
+import argparse
+import queue
+import threading
+import time
+
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+from config import DB_CONFIG, RETRAIN_CONFIG
+from src.model.registry import MODEL_PATH, load_model
+
+
+CHUNK_SIZE = 10000
+QUEUE_SIZE = 4
+CURSOR_NAME = "customer_scoring_cursor"
+
+# Marks the end of the stream between the fetch, score and write stages:
+_DONE = object()
+
+
+CREATE_PREDICTIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS customer_predictions (
+        customer_id TEXT PRIMARY KEY,
+        prediction INTEGER NOT NULL,
+        churn_probability DOUBLE PRECISION NOT NULL,
+        scored_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+"""
+
+UPSERT_PREDICTIONS = """
+    INSERT INTO customer_predictions (customer_id, prediction, churn_probability)
+    VALUES %s
+    ON CONFLICT (customer_id) DO UPDATE
+    SET prediction = EXCLUDED.prediction,
+        churn_probability = EXCLUDED.churn_probability,
+        scored_at = NOW();
+"""
+
+
+
+def iter_customer_chunks(conn, chunk_size=CHUNK_SIZE):
+    """
+    Reads the customer table through a named (server-side) cursor, so only one chunk of rows
+    is held on the client at a time.
+    """
+    with conn.cursor(name=CURSOR_NAME) as cursor:
+        cursor.itersize = chunk_size
+        cursor.execute("SELECT * FROM customer;")
+        columns = None
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if columns is None:
+                columns = [desc[0] for desc in cursor.description]
+            yield pd.DataFrame(rows, columns=columns)
+
+
+
+def prepare_features(chunk):
+    """
+    Applies the same clean-up as the training notebook and splits off the customer ids.
+    """
+    customer_ids = chunk["customer_id"].astype(str)
+    features = chunk.drop(columns=["customer_id", "churn", RETRAIN_CONFIG["watermark_column"]], errors="ignore")
+    features["senior_citizen"] = features["senior_citizen"].astype("object")
+    features["monthly_charges"] = features["monthly_charges"].astype("float64")
+    features["total_charges"] = features["total_charges"].astype("float64")
+    return customer_ids, features
+
+
+
+def score_chunk(model, chunk):
+    """
+    Runs one chunk through the saved pipeline and returns the rows to write back.
+    """
+    customer_ids, features = prepare_features(chunk)
+    pred_prob = model.predict_proba(features)
+    labels = model.classes_[pred_prob.argmax(axis=1)]
+    churn_prob = pred_prob[:, list(model.classes_).index(1)]
+    return list(zip(customer_ids.tolist(), labels.astype(int).tolist(), churn_prob.tolist()))
+
+
+
+def write_predictions(conn, rows, page_size=1000):
+    """
+    Writes one chunk of predictions back in bulk with execute_values.
+    """
+    with conn.cursor() as cursor:
+        execute_values(cursor, UPSERT_PREDICTIONS, rows, page_size=page_size)
+    conn.commit()
+
+
+
+def _fetch_stage(conn, chunk_size, out_queue, errors):
+    """
+    Pushes chunks from the server-side cursor onto the queue until the table is exhausted
+    or another stage has failed.
+    """
+    try:
+        for chunk in iter_customer_chunks(conn, chunk_size):
+            if errors:
+                break
+            out_queue.put(chunk)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        out_queue.put(_DONE)
+
+
+
+def _score_stage(model, in_queue, out_queue, errors):
+    """
+    Scores chunks as they arrive. It keeps draining its input after a failure, so the fetch
+    stage can never block on a full queue.
+    """
+    for chunk in _drain(in_queue):
+        if errors:
+            continue
+        try:
+            out_queue.put(score_chunk(model, chunk))
+        except Exception as e:
+            errors.append(e)
+    out_queue.put(_DONE)
+
+
+
+def _drain(in_queue):
+    """
+    Yields the items of a queue until the end marker shows up.
+    """
+    while True:
+        item = in_queue.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+
+def run_bulk_scoring(chunk_size=CHUNK_SIZE, queue_size=QUEUE_SIZE, model_path=MODEL_PATH):
+    """
+    Scores the whole customer table in constant memory. Fetching, scoring and writing run
+    concurrently and are connected by bounded queues, so a slow stage applies backpressure
+    instead of letting chunks pile up.
+    """
+    model = load_model(model_path)
+    read_conn = psycopg2.connect(**DB_CONFIG)
+    write_conn = psycopg2.connect(**DB_CONFIG)
+
+    fetched = queue.Queue(maxsize=queue_size)
+    scored = queue.Queue(maxsize=queue_size)
+    errors = []
+    total_rows = 0
+    start = time.perf_counter()
+
+    try:
+        with write_conn.cursor() as cursor:
+            cursor.execute(CREATE_PREDICTIONS_TABLE)
+        write_conn.commit()
+
+        fetcher = threading.Thread(
+            target=_fetch_stage, args=(read_conn, chunk_size, fetched, errors), daemon=True
+        )
+        scorer = threading.Thread(
+            target=_score_stage, args=(model, fetched, scored, errors), daemon=True
+        )
+        fetcher.start()
+        scorer.start()
+
+        # Writing happens on the calling thread, which also drains after a failure:
+        for rows in _drain(scored):
+            if errors:
+                continue
+            try:
+                write_predictions(write_conn, rows)
+                total_rows += len(rows)
+            except Exception as e:
+                errors.append(e)
+
+        fetcher.join()
+        scorer.join()
+        if errors:
+            raise errors[0]
+
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    elapsed = time.perf_counter() - start
+    rows_per_sec = total_rows / elapsed if elapsed > 0 else 0.0
+    print(f"Scored {total_rows} customers in {elapsed:.2f}s ({rows_per_sec:,.0f} rows/sec)")
+    return {"rows": total_rows, "seconds": elapsed, "rows_per_sec": rows_per_sec}
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score every customer in the database with the saved model.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args()
+    run_bulk_scoring(chunk_size=args.chunk_size, queue_size=args.queue_size, model_path=args.model_path)
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+
+import pandas as pd
+from config import CHURN_SUMMARY_CONFIG
+from src.data_processing.database import get_pool
+
+
+CHURN_DISTRIBUTION_CSV = "data/churn_distribution.csv"
+
+# Churn counts kept up to date by statement-level triggers on customer, plus a change
+# counter, so readers never have to scan the customer table. Each INSERT, UPDATE or DELETE
+# statement nets its rows per churn value from the transition tables and applies them in
+# one upsert, so a bulk load of N rows touches each summary row and the counter once rather
+# than N times, and the counter only moves when a count actually changed. Transition tables
+# allow neither several events per trigger nor column lists, hence three triggers, and the
+# UPDATE one also fires for updates of other columns (which net to no change):
+CREATE_CHURN_SUMMARY = """
+    CREATE TABLE IF NOT EXISTS churn_summary (
+        churn TEXT PRIMARY KEY,
+        count BIGINT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS churn_summary_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL
+    );
+
+    CREATE OR REPLACE FUNCTION churn_summary_apply() RETURNS TRIGGER AS $$
+    DECLARE
+        changed BIGINT;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO churn_summary (churn, count)
+            SELECT churn, COUNT(*) FROM new_rows GROUP BY churn
+            ON CONFLICT (churn) DO UPDATE SET count = churn_summary.count + EXCLUDED.count;
+        ELSIF TG_OP = 'DELETE' THEN
+            INSERT INTO churn_summary (churn, count)
+            SELECT churn, -COUNT(*) FROM old_rows GROUP BY churn
+            ON CONFLICT (churn) DO UPDATE SET count = churn_summary.count + EXCLUDED.count;
+        ELSE
+            INSERT INTO churn_summary (churn, count)
+            SELECT churn, SUM(delta) FROM (
+                SELECT churn, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT churn, -1 AS delta FROM old_rows
+            ) AS deltas
+            GROUP BY churn HAVING SUM(delta) <> 0
+            ON CONFLICT (churn) DO UPDATE SET count = churn_summary.count + EXCLUDED.count;
+        END IF;
+        GET DIAGNOSTICS changed = ROW_COUNT;
+        IF changed > 0 THEN
+            UPDATE churn_summary_version SET version = version + 1;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS churn_summary_sync ON customer;
+    DROP TRIGGER IF EXISTS churn_summary_insert ON customer;
+    DROP TRIGGER IF EXISTS churn_summary_update ON customer;
+    DROP TRIGGER IF EXISTS churn_summary_delete ON customer;
+    CREATE TRIGGER churn_summary_insert
+    AFTER INSERT ON customer REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION churn_summary_apply();
+    CREATE TRIGGER churn_summary_update
+    AFTER UPDATE ON customer REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION churn_summary_apply();
+    CREATE TRIGGER churn_summary_delete
+    AFTER DELETE ON customer REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION churn_summary_apply();
+"""
+
+BACKFILL_CHURN_SUMMARY = """
+    LOCK TABLE customer IN SHARE MODE;
+    DELETE FROM churn_summary;
+    INSERT INTO churn_summary (churn, count)
+    SELECT churn, COUNT(*) FROM customer GROUP BY churn;
+    INSERT INTO churn_summary_version (id, version) VALUES (TRUE, 1)
+    ON CONFLICT (id) DO UPDATE SET version = churn_summary_version.version + 1;
+"""
+
+
+
+def create_churn_summary():
+    """
+    Creates the summary tables and the triggers and fills them with one full GROUP BY. Only
+    needed once (or to rebuild the counts); afterwards the triggers keep them current.
+    """
+    with get_pool().connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_CHURN_SUMMARY)
+                cursor.execute(BACKFILL_CHURN_SUMMARY)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+
+def _db_version():
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT version FROM churn_summary_version;")
+            row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+
+def _db_distribution():
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT churn, count FROM churn_summary ORDER BY churn;")
+            rows = cursor.fetchall()
+    return pd.DataFrame(rows, columns=["churn", "count"])
+
+
+
+def _csv_version(path=CHURN_DISTRIBUTION_CSV):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+
+def _csv_distribution(path=CHURN_DISTRIBUTION_CSV):
+    return pd.read_csv(path)
+
+
+
+class ChurnDistributionCache:
+    """
+    Serves the churn distribution from memory. Once ttl seconds have passed, the next read
+    checks the change counter (one single-row lookup) and reloads the counts only if it
+    moved.
+    """
+    def __init__(self, load_fn, version_fn, ttl=60.0):
+        self.load_fn = load_fn
+        self.version_fn = version_fn
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._checked_at = 0.0
+        self.reloads = 0
+
+
+    def get(self, refresh=False):
+        """The cached distribution; refresh=True checks the change counter right away."""
+        with self._lock:
+            now = time.monotonic()
+            if self._data is None or refresh or now - self._checked_at >= self.ttl:
+                version = self.version_fn()
+                if self._data is None or version != self._version:
+                    self._data = self.load_fn()
+                    self._version = version
+                    self.reloads += 1
+                self._checked_at = now
+            return self._data
+
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_churn_distribution(refresh=False):
+    """
+    The churn distribution (columns churn and count) for the Home page, from the summary
+    table or from the static CSV depending on CHURN_SUMMARY_CONFIG.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if CHURN_SUMMARY_CONFIG["source"] == "db":
+                    _cache = ChurnDistributionCache(_db_distribution, _db_version, CHURN_SUMMARY_CONFIG["ttl"])
+                else:
+                    _cache = ChurnDistributionCache(_csv_distribution, _csv_version, CHURN_SUMMARY_CONFIG["ttl"])
+    return _cache.get(refresh=refresh)
+
+
+
+def get_baseline_churn_rate():
+    """
+    Share of churned customers, in percent.
+    """
+    data = get_churn_distribution()
+    total_churn_count = data.loc[data["churn"] == "Yes", "count"].sum()
+    total_customers = data["count"].sum()
+    return (total_churn_count / total_customers) * 100
+
+
+
+if __name__ == "__main__":
+    create_churn_summary()
+    print(_db_distribution())
@@ -1,51 +1,236 @@
 import pandas as pd
 import psycopg2
 from psycopg2 import sql
-from config import DB_CONFIG
+from config import DB_CONFIG, DB_POOL_CONFIG
 import streamlit as st
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """
+    Raised when no connection could be checked out within checkout_timeout. Nothing broke,
+    the pool is just saturated, so retrying right away only doubles the wait.
+    """
+
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of database connections with a health check on checkout.
+    Callers wait (up to checkout_timeout) when all connections are in use, and the waits are
+    counted so the pool can be sized under load.
+    """
+    def __init__(self, connection_factory, minconn=1, maxconn=10, checkout_timeout=30.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: minconn={minconn}, maxconn={maxconn}")
+        self.connection_factory = connection_factory
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._metrics = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "connects": 0,
+            "reconnects": 0,
+            "timeouts": 0
+        }
+        for _ in range(minconn):
+            self._idle.put(self._connect())
+
+
+    def _connect(self):
+        conn = self.connection_factory()
+        with self._lock:
+            self._metrics["connects"] += 1
+        return conn
+
+
+    @staticmethod
+    def _is_healthy(conn):
+        """Checks a connection before handing it out."""
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+
+    def getconn(self):
+        """
+        Checks a connection out of the pool, replacing it with a fresh one if it went stale.
+        """
+        if not self._slots.acquire(blocking=False):
+            start = time.perf_counter()
+            acquired = self._slots.acquire(timeout=self.checkout_timeout)
+            waited = time.perf_counter() - start
+            with self._lock:
+                self._metrics["waits"] += 1
+                self._metrics["wait_time"] += waited
+                if not acquired:
+                    self._metrics["timeouts"] += 1
+            if not acquired:
+                raise PoolTimeout(f"No database connection available after {self.checkout_timeout}s")
+
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                conn = self._connect()
+            else:
+                if not self._is_healthy(conn):
+                    self._close_quietly(conn)
+                    conn = self._connect()
+                    with self._lock:
+                        self._metrics["reconnects"] += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._metrics["checkouts"] += 1
+        return conn
+
+
+    def putconn(self, conn, close=False):
+        """
+        Returns a connection to the pool. Broken connections are closed instead of reused.
+        """
+        try:
+            if close or conn.closed:
+                self._close_quietly(conn)
+            else:
+                try:
+                    conn.rollback()
+                    self._idle.put(conn)
+                except Exception:
+                    self._close_quietly(conn)
+        finally:
+            self._slots.release()
+
+
+    @contextmanager
+    def connection(self):
+        """Context manager around getconn/putconn."""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except psycopg2.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+
+    def closeall(self):
+        """Closes every idle connection."""
+        while True:
+            try:
+                self._close_quietly(self._idle.get_nowait())
+            except Empty:
+                break
+
+
+    def metrics(self):
+        """A snapshot of the pool counters."""
+        with self._lock:
+            snapshot = dict(self._metrics)
+        snapshot["idle"] = self._idle.qsize()
+        snapshot["avg_wait_time"] = snapshot["wait_time"] / snapshot["waits"] if snapshot["waits"] else 0.0
+        return snapshot
+
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    connection_factory=lambda: psycopg2.connect(
+                        **DB_CONFIG,
+                        connect_timeout=DB_POOL_CONFIG["connect_timeout"]
+                    ),
+                    minconn=DB_POOL_CONFIG["minconn"],
+                    maxconn=DB_POOL_CONFIG["maxconn"],
+                    checkout_timeout=DB_POOL_CONFIG["checkout_timeout"]
+                )
+    return _pool
+
+
+def get_pool_metrics():
+    """
+    Pool counters (checkouts, waits, wait time, reconnects) for sizing the pool under load.
+    """
+    return get_pool().metrics() if _pool is not None else {}
+
 
 
 def execute_query(
-    query: str, 
-    return_df: bool = False, 
+    query: str,
+    return_df: bool = False,
     return_column_names: bool = True
 ):
     """Handles database queries with proper error recovery"""
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            **DB_CONFIG,
-            connect_timeout=5  
-        )
-        
-        
-        with conn.cursor() as cursor:
-            cursor.execute(query)
-            
-            
-            if cursor.rowcount == 0:
-                st.warning("Query returned no results")
-                return pd.DataFrame() if return_df else None
-            
-          
-            if return_df:
-                return pd.DataFrame(
-                    cursor.fetchall(),
-                    columns=[desc[0] for desc in cursor.description]
-                )
-                
-            rows = cursor.fetchall()
-            return (rows, [desc[0] for desc in cursor.description]) if return_column_names else rows
-
-    except psycopg2.OperationalError as e:
-        st.error(f"🚨 Database connection failed: {e}")
-        return pd.DataFrame() if return_df else None  
-        
-    except Exception as e:
-        st.error(f"⚠️ Query failed: {e}")
-        return None
-        
-    finally:
-        if conn:
-            conn.close()
-    
\ No newline at end of file
+    # A connection that drops mid-query is discarded by the pool and the query retried once
+    # on a fresh connection. A saturated pool is reported right away:
+    for attempt in range(2):
+        try:
+            with get_pool().connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query)
+
+
+                    if cursor.rowcount == 0:
+                        st.warning("Query returned no results")
+                        return pd.DataFrame() if return_df else None
+
+
+                    if return_df:
+                        return pd.DataFrame(
+                            cursor.fetchall(),
+                            columns=[desc[0] for desc in cursor.description]
+                        )
+
+                    rows = cursor.fetchall()
+                    return (rows, [desc[0] for desc in cursor.description]) if return_column_names else rows
+
+        except PoolTimeout as e:
+            st.error(f"🚨 Database is busy: {e}")
+            return pd.DataFrame() if return_df else None
+
+        except psycopg2.OperationalError as e:
+            if attempt == 0:
+                continue
+            st.error(f"🚨 Database connection failed: {e}")
+            return pd.DataFrame() if return_df else None
+
+        except Exception as e:
+            st.error(f"⚠️ Query failed: {e}")
+            return None
@@ -0,0 +1,202 @@
+import csv
+import io
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from src.data_processing.database import get_pool
+
+
+CREATE_PREDICTIONS_LOG_TABLE = """
+    CREATE TABLE IF NOT EXISTS predictions (
+        id BIGSERIAL PRIMARY KEY,
+        predicted_at TIMESTAMPTZ NOT NULL,
+        model_version TEXT,
+        prediction INTEGER NOT NULL,
+        prediction_proba DOUBLE PRECISION NOT NULL,
+        latency_ms DOUBLE PRECISION,
+        features JSONB NOT NULL
+    );
+"""
+
+COPY_PREDICTIONS = """
+    COPY predictions (predicted_at, model_version, prediction, prediction_proba, latency_ms, features)
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+_COLUMNS = ("predicted_at", "model_version", "prediction", "prediction_proba", "latency_ms", "features")
+_table_ready = False
+
+
+
+def prediction_record(features, prediction, prediction_proba, model_version, latency_ms):
+    """
+    One row of the prediction log, timestamped now.
+    """
+    return {
+        "predicted_at": datetime.now(timezone.utc).isoformat(),
+        "model_version": model_version,
+        "prediction": int(prediction),
+        "prediction_proba": float(prediction_proba),
+        "latency_ms": float(latency_ms),
+        "features": features
+    }
+
+
+
+def copy_predictions(records):
+    """
+    Writes a batch of prediction records to the predictions table with a single COPY,
+    through the shared connection pool.
+    """
+    global _table_ready
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        writer.writerow([json.dumps(record[c]) if c == "features" else record[c] for c in _COLUMNS])
+    buffer.seek(0)
+
+    with get_pool().connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                if not _table_ready:
+                    cursor.execute(CREATE_PREDICTIONS_LOG_TABLE)
+                cursor.copy_expert(COPY_PREDICTIONS, buffer)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    _table_ready = True
+
+
+
+class PredictionLogger:
+    """
+    Buffers prediction records in memory and writes them in bulk from a background thread,
+    so logging never waits on the database.
+
+    log() only appends to a bounded ring buffer. The writer flushes once batch_size records
+    are waiting or flush_interval seconds have passed. When the database is slow or down the
+    writer backs off, the buffer fills up and the oldest records are dropped and counted
+    instead of slowing down the callers.
+
+    write_fn takes a list of records and writes them, raising on failure.
+    """
+    def __init__(self, write_fn, capacity=10000, batch_size=500, flush_interval=1.0, max_backoff=30.0):
+        if capacity < 1 or batch_size < 1 or flush_interval <= 0:
+            raise ValueError("capacity and batch_size must be positive and flush_interval above zero")
+        self.write_fn = write_fn
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._counters = {"logged": 0, "written": 0, "dropped": 0, "batches": 0, "write_errors": 0}
+        self._last_write_seconds = 0.0
+        self._backoff = 0.0
+
+
+    def start(self):
+        """Starts the background writer."""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+            self._thread.start()
+
+
+    def stop(self, timeout=10.0):
+        """Stops the writer after a final flush of whatever is still buffered."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+    def log(self, record):
+        """Queues one record. Never blocks on the database."""
+        with self._cond:
+            if len(self._buffer) >= self.capacity:
+                self._buffer.popleft()
+                self._counters["dropped"] += 1
+            self._buffer.append(record)
+            self._counters["logged"] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+
+    def flush(self):
+        """Writes everything buffered right now on the calling thread."""
+        while self._write_batch():
+            pass
+
+
+    def stats(self):
+        """Counters for the buffer and the writer, to spot a slow or failing database."""
+        with self._cond:
+            stats = dict(self._counters)
+            stats["pending"] = len(self._buffer)
+        stats["capacity"] = self.capacity
+        stats["last_write_ms"] = self._last_write_seconds * 1000
+        stats["backoff_seconds"] = self._backoff
+        return stats
+
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # After a failed write, wait out the backoff even if the buffer is full:
+                backoff_until = time.monotonic() + self._backoff
+                while not self._stopping and time.monotonic() < backoff_until:
+                    self._cond.wait(backoff_until - time.monotonic())
+                deadline = time.monotonic() + self.flush_interval
+                while not self._stopping and len(self._buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+
+            if stopping:
+                # Final flush; give up on the first failure rather than hang the shutdown:
+                while self._write_batch():
+                    pass
+                return
+            while self._write_batch() and len(self._buffer) >= self.batch_size:
+                pass
+
+
+    def _write_batch(self):
+        """Writes one batch. Returns False when there was nothing to write or the write failed."""
+        with self._cond:
+            if not self._buffer:
+                return False
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+
+        start = time.perf_counter()
+        try:
+            self.write_fn(batch)
+        except Exception:
+            with self._cond:
+                self._counters["write_errors"] += 1
+                # Put the batch back in front, dropping whatever no longer fits:
+                room = self.capacity - len(self._buffer)
+                kept = batch[-room:] if room > 0 else []
+                self._counters["dropped"] += len(batch) - len(kept)
+                self._buffer.extendleft(reversed(kept))
+            self._backoff = min(max(self._backoff * 2, self.flush_interval), self.max_backoff)
+            return False
+
+        self._last_write_seconds = time.perf_counter() - start
+        self._backoff = 0.0
+        with self._cond:
+            self._counters["written"] += len(batch)
+            self._counters["batches"] += 1
+        return True
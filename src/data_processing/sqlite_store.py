@@ -0,0 +1,17 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+
+@contextmanager
+def sqlite_connection(db_path, timeout=5):
+    """
+    A short-lived SQLite connection that commits on success, rolls back on error and is
+    always closed. Used by the on-disk explanation and report caches.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,95 @@
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.model.registry import MODEL_PATH, get_explainer_context
+
+
+# Rows explained per TreeExplainer call; bounds the size of the raw one-hot SHAP matrix:
+CHUNK_SIZE = 1000
+
+
+
+def iter_explanations(context, data, chunk_size=CHUNK_SIZE):
+    """
+    Explains a DataFrame (or list of records) chunk by chunk with one vectorized
+    TreeExplainer call per chunk, yielding the churn probabilities and the SHAP values
+    aggregated back to the original features. No plots are produced.
+    """
+    if not hasattr(data, "iloc"):
+        data = pd.DataFrame(data)
+    for start in range(0, len(data), chunk_size):
+        explanation = context.explain(data.iloc[start:start + chunk_size])
+        yield {
+            "churn_probability": explanation["churn_probability"],
+            "agg_shap": explanation["agg_shap"].astype(np.float32)
+        }
+
+
+
+def explain_batch(context, data, chunk_size=CHUNK_SIZE):
+    """
+    Explains N customers and returns a compact columnar result:
+    features (column names), base_value, churn_probability (N,) and agg_shap (N, features).
+    """
+    n_rows = len(data)
+    churn_probability = np.empty(n_rows, dtype=np.float64)
+    agg_shap = np.empty((n_rows, len(context.original_features)), dtype=np.float32)
+    start = 0
+    for chunk in iter_explanations(context, data, chunk_size):
+        end = start + len(chunk["churn_probability"])
+        churn_probability[start:end] = chunk["churn_probability"]
+        agg_shap[start:end] = chunk["agg_shap"]
+        start = end
+    return {
+        "features": list(context.original_features),
+        "base_value": context.expected_value,
+        "churn_probability": churn_probability,
+        "agg_shap": agg_shap
+    }
+
+
+
+def _arrow_schema(context):
+    fields = [pa.field("churn_probability", pa.float64())]
+    fields += [pa.field(f"shap_{feature}", pa.float32()) for feature in context.original_features]
+    return pa.schema(fields, metadata={"base_value": str(context.expected_value)})
+
+
+
+def write_parquet(context, data, destination, chunk_size=CHUNK_SIZE, ids=None):
+    """
+    Streams the explanations into a Parquet file (a path or a binary file object), one row
+    group per chunk, so memory stays bounded however many customers are explained.
+    The base value is stored in the schema metadata.
+    """
+    schema = _arrow_schema(context)
+    if ids is not None:
+        schema = schema.insert(0, pa.field("customer_id", pa.string()))
+    start = 0
+    with pq.ParquetWriter(destination, schema) as writer:
+        for chunk in iter_explanations(context, data, chunk_size):
+            end = start + len(chunk["churn_probability"])
+            columns = [pa.array(chunk["churn_probability"])]
+            columns += [pa.array(chunk["agg_shap"][:, i]) for i in range(chunk["agg_shap"].shape[1])]
+            if ids is not None:
+                columns.insert(0, pa.array([str(i) for i in ids[start:end]]))
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            start = end
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain many customers at once and write the SHAP values to Parquet.")
+    parser.add_argument("input", help="CSV or Parquet file with one customer per row")
+    parser.add_argument("output", help="Parquet file to write")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    data = pd.read_parquet(args.input) if args.input.endswith(".parquet") else pd.read_csv(args.input)
+    ids = data.pop("customer_id").tolist() if "customer_id" in data.columns else None
+    data = data.drop(columns=["churn"], errors="ignore")
+    write_parquet(get_explainer_context(args.model_path), data, args.output, args.chunk_size, ids=ids)
+    print(f"Explained {len(data)} customers -> {args.output}")
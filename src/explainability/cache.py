@@ -0,0 +1,150 @@
+import hashlib
+import json
+import numbers
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from src.data_processing.sqlite_store import sqlite_connection
+
+
+
+def canonical_features(features):
+    """
+    Normalizes a feature dict so that equal customers always serialize the same way:
+    keys are sorted and numbers become floats (5 and 5.0 are the same tenure). Strings
+    are kept exactly as the model sees them; "Month-to-month " is an unknown category to
+    the encoder and scores differently from "Month-to-month".
+    """
+    canonical = {}
+    for key in sorted(features):
+        value = features[key]
+        if hasattr(value, "item"):  # NumPy scalars
+            value = value.item()
+        if isinstance(value, numbers.Number) and not isinstance(value, bool):
+            value = float(value)
+        canonical[key] = value
+    return canonical
+
+
+
+def explanation_key(features, model_version):
+    """
+    A stable hash of the canonicalized feature vector plus the model version.
+    """
+    payload = json.dumps(
+        {"model_version": model_version, "features": canonical_features(features)},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+
+class ExplanationCache:
+    """
+    A process-wide cache of SHAP explanation results (agg_shap, base_value, prediction,
+    probabilities), shared by every session.
+
+    The first tier is an in-memory LRU. The optional second tier is a SQLite file, so
+    explanations survive restarts and are shared between worker processes. Values must be
+    JSON-serializable.
+    """
+    def __init__(self, max_entries=1024, db_path=None, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            with sqlite_connection(self.db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS explanations (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                """)
+
+
+    def get(self, key):
+        """Returns the cached explanation for key, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+
+        value = self._disk_get(key) if self.db_path else None
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._remember(key, value)
+        return value
+
+
+    def put(self, key, value):
+        """Stores an explanation in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+        if self.db_path:
+            self._disk_put(key, value)
+
+
+    def stats(self):
+        """Hit/miss counters and the current memory-tier size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+    def clear(self):
+        """Drops every cached explanation from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            with sqlite_connection(self.db_path) as conn:
+                conn.execute("DELETE FROM explanations")
+
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+    def _disk_get(self, key):
+        try:
+            with sqlite_connection(self.db_path) as conn:
+                row = conn.execute("SELECT value FROM explanations WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE explanations SET last_access = ? WHERE key = ?", (time.time(), key))
+            return json.loads(row[0])
+        except sqlite3.Error:
+            return None
+
+
+    def _disk_put(self, key, value):
+        try:
+            with sqlite_connection(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO explanations (key, value, last_access) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time())
+                )
+                conn.execute("""
+                    DELETE FROM explanations WHERE key IN (
+                        SELECT key FROM explanations ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_disk_entries,))
+        except sqlite3.Error:
+            # The disk tier is best-effort; the in-memory tier already holds the value.
+            pass
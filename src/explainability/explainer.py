@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+import shap
+
+
+
+def map_output_features(feature_names, original_features):
+    """
+    Maps every transformed column name (e.g. 'encoding__contract_Two year') back to the
+    original feature it was derived from.
+    """
+    feature_mapping = []
+    for feature_name in feature_names:
+        parts = feature_name.split('__')
+        if feature_name.startswith('encoding__') and len(parts) >= 2:
+            full_feature = parts[1]
+            for orig_feature in original_features:
+                if full_feature.startswith(orig_feature):
+                    feature_mapping.append(orig_feature)
+                    break
+            else:
+                feature_mapping.append('_'.join(full_feature.split('_')[:-1]))
+        elif feature_name.startswith('remainder__') and len(parts) >= 2:
+            feature_mapping.append(parts[1])
+        else:
+            feature_mapping.append(feature_name)
+    return feature_mapping
+
+
+
+class ExplainerContext:
+    """
+    Everything needed to explain predictions of one loaded tree pipeline, built once per
+    model load and reused across calls and sessions: the TreeExplainer, the transformed
+    feature names, the one-hot column -> original feature index array and the expected
+    value of the churn class. version is the model version it explains, when known.
+    """
+    def __init__(self, model, churn_class=1, version=None):
+        self.model = model
+        self.version = version
+        self.preprocessor = model.named_steps['preprocessor']
+        self.final_model = model.named_steps['model']
+        self.explainer = shap.TreeExplainer(self.final_model)
+        self.churn_index = list(self.final_model.classes_).index(churn_class)
+
+        self.feature_names = self.preprocessor.get_feature_names_out()
+        mapping = map_output_features(self.feature_names, list(self.preprocessor.feature_names_in_))
+        # Original features in order of first appearance, as the old dict aggregation produced them:
+        self.original_features = list(dict.fromkeys(mapping))
+        self.group_index = np.array([self.original_features.index(f) for f in mapping], dtype=np.intp)
+        # Start of every run of columns that belong to the same original feature, for reduceat:
+        self.run_starts = np.flatnonzero(np.r_[True, self.group_index[1:] != self.group_index[:-1]])
+        self.run_groups = self.group_index[self.run_starts]
+
+        expected_value = np.atleast_1d(self.explainer.expected_value)
+        self.expected_value = float(expected_value[self.churn_index] if expected_value.size > 1 else expected_value[0])
+
+
+    def transform(self, customer_df):
+        X_transformed = self.preprocessor.transform(customer_df)
+        if hasattr(X_transformed, "toarray"):
+            X_transformed = X_transformed.toarray()
+        return np.asarray(X_transformed, dtype=np.float64)
+
+
+    def shap_for_churn(self, X_transformed):
+        """
+        SHAP values of the churn class for every transformed column, shape (rows, columns).
+        """
+        shap_values = self.explainer.shap_values(X_transformed)
+        if isinstance(shap_values, list):
+            return np.asarray(shap_values[self.churn_index])
+        if shap_values.ndim == 3:
+            return shap_values[:, :, self.churn_index]
+        return shap_values
+
+
+    def aggregate(self, shap_for_churn):
+        """
+        Sums the one-hot SHAP columns back into the original features, shape (rows, features).
+        """
+        run_sums = np.add.reduceat(shap_for_churn, self.run_starts, axis=1)
+        aggregated = np.zeros((shap_for_churn.shape[0], len(self.original_features)))
+        np.add.at(aggregated.T, self.run_groups, run_sums.T)
+        return aggregated
+
+
+    def explain(self, customer_df):
+        """
+        Explains one or more customers. Returns the raw and aggregated SHAP values of the churn
+        class, the base value and the churn probabilities.
+        """
+        if isinstance(customer_df, dict):
+            customer_df = pd.DataFrame([customer_df])
+        X_transformed = self.transform(customer_df)
+        shap_for_churn = self.shap_for_churn(X_transformed)
+        churn_probability = self.final_model.predict_proba(X_transformed)[:, self.churn_index]
+        return {
+            "shap_values": shap_for_churn,
+            "agg_shap": self.aggregate(shap_for_churn),
+            "base_value": self.expected_value,
+            "churn_probability": churn_probability
+        }
+
+
+    def as_dicts(self, aggregated):
+        """
+        Turns aggregated rows into {feature: shap value} dicts, in the original feature order.
+        """
+        return [dict(zip(self.original_features, row.tolist())) for row in aggregated]
+
+
+
+def compute_explanation(customer_data, model, background_data=None, explainer_context=None):
+    """
+    Computes the SHAP explanation of one customer without rendering anything: the prediction,
+    churn probability, base value, raw and aggregated SHAP values and the customer's values.
+
+    Tree models are explained through an ExplainerContext; pass the one built at model load
+    so the TreeExplainer and feature mapping are not rebuilt on every call.
+    """
+    # Extract model components
+    final_model = model.named_steps['model']
+    preprocessor = model.named_steps['preprocessor']
+
+    if isinstance(customer_data, dict):
+        customer_df = pd.DataFrame([customer_data])
+    else:
+        customer_df = customer_data
+
+    if explainer_context is None and hasattr(final_model, 'estimators_') and hasattr(final_model, 'predict_proba'):
+        explainer_context = ExplainerContext(model)
+
+    if explainer_context is not None:
+        explanation = explainer_context.explain(customer_df)
+        shap_values = explanation["shap_values"]
+        base_value = explanation["base_value"]
+        aggregated_shap = explainer_context.as_dicts(explanation["agg_shap"])[0]
+    else:
+        shap_values, base_value, aggregated_shap = explain_generic(
+            customer_df, final_model, preprocessor, background_data
+        )
+    
+    # Get customer values
+    customer_values = {}
+    for feature in customer_df.columns.tolist():
+        customer_values[feature] = str(customer_df.iloc[0][feature])
+    
+    # ===== PREDICTION =====
+    if explainer_context is not None:
+        churn_proba = explanation["churn_probability"][0]
+        pred_prob = np.array([1 - churn_proba, churn_proba])
+    else:
+        pred_prob = model.predict_proba(customer_df)[0]
+    prediction = final_model.classes_[pred_prob.argmax()]
+    prediction_proba = pred_prob[1]
+    prediction_label = "Churn" if prediction == 1 else "No Churn"
+
+    return {
+        "prediction": prediction_label,
+        "churn_probability": float(prediction_proba),
+        "base_value": float(base_value),
+        "shap_values": shap_values,
+        "agg_shap": aggregated_shap,
+        "customer_values": customer_values,
+        "customer_data" : customer_df
+    }
+
+
+
+def explain_generic(customer_df, final_model, preprocessor, background_data=None):
+    """
+    Explains a single customer for models that are not tree ensembles (linear, kernel or
+    generic SHAP explainers). Returns the raw SHAP values, the base value and the SHAP values
+    aggregated back to the original features.
+    """
+    # Transform customer data
+    X_transformed = preprocessor.transform(customer_df)
+    if hasattr(X_transformed, "toarray"):
+        X_transformed = X_transformed.toarray()
+    
+    # Get feature names
+    if hasattr(preprocessor, 'get_feature_names_out'):
+        feature_names = preprocessor.get_feature_names_out()
+    else:
+        feature_names = [f"feature_{i}" for i in range(X_transformed.shape[1])]
+    
+    # Create explainer
+    if hasattr(final_model, 'predict_proba'):
+        if hasattr(final_model, 'coef_'):
+            explainer = shap.LinearExplainer(final_model, X_transformed)
+        else:
+            if background_data is not None:
+                X_background = preprocessor.transform(background_data)
+                if hasattr(X_background, "toarray"):
+                    X_background = X_background.toarray()
+                explainer = shap.KernelExplainer(final_model.predict_proba, X_background)
+            else:
+                explainer = shap.Explainer(final_model, X_transformed, feature_names=feature_names)
+    else:
+        explainer = shap.Explainer(final_model, X_transformed, feature_names=feature_names)
+    
+    # Get SHAP values
+    if isinstance(explainer, shap.KernelExplainer):
+        shap_values = explainer.shap_values(X_transformed)
+        if isinstance(shap_values, list) and len(shap_values) > 1:
+            shap_for_churn = shap_values[1] 
+        else:
+            shap_for_churn = shap_values
+        base_value = explainer.expected_value
+        if isinstance(base_value, list) and len(base_value) > 1:
+            base_value = base_value[1]
+    else:
+        shap_values = explainer(X_transformed)
+        if len(shap_values.shape) > 2 and shap_values.shape[2] > 1:
+            shap_for_churn = shap_values[:, :, 1].values
+            base_value = shap_values[0, :, 1].base_values
+        else:
+            shap_for_churn = shap_values.values
+            base_value = shap_values.base_values
+    
+    # Feature mapping
+    feature_mapping = dict(enumerate(map_output_features(feature_names, customer_df.columns.tolist())))
+    
+    # Aggregate SHAP values
+    aggregated_shap = {}
+    for i, shap_value in enumerate(shap_for_churn[0]):
+        original_feature = feature_mapping.get(i)
+        if original_feature not in aggregated_shap:
+            aggregated_shap[original_feature] = 0
+        aggregated_shap[original_feature] += shap_value
+    
+    return shap_values, base_value, aggregated_shap
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from api.schemas import Input_features
+from config import PREDICTION_BACKEND_CONFIG
+
+
+
+class LocalBackend:
+    """
+    Scores in-process with the model cached by the registry, without any network hop.
+    """
+    name = "local"
+
+    def __init__(self):
+        from src.model.registry import get_predictor, loaded_model_version
+        self.predictor = get_predictor()
+        # The version the predictor was built from, not whatever has been promoted since:
+        self.version = loaded_model_version()
+
+
+    def predict(self, features):
+        from src.model.scoring import score_frame
+        # Validated and coerced exactly like the API does it:
+        record = Input_features(**features).model_dump()
+        labels, probs = score_frame(self.predictor, [record])
+        return {"Prediction": labels[0].item(), "Prediction_proba": float(probs[0]), "Model_version": self.version}
+
+
+    def close(self):
+        pass
+
+
+
+class HTTPBackend:
+    """
+    Calls the FastAPI /predict endpoint through one pooled keep-alive session, with connect
+    and read timeouts and retries on connection errors and 429/5xx answers. Scoring is
+    idempotent, so retrying the POST is safe.
+    """
+    name = "http"
+
+    def __init__(self, url, connect_timeout=5.0, read_timeout=60.0, retries=3, pool_size=10):
+        self.url = url.rstrip("/") + "/predict"
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=frozenset({"POST"})
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+
+    def predict(self, features):
+        res = self.session.post(self.url, json=features, timeout=self.timeout)
+        res.raise_for_status()
+        result = res.json()
+        # The API reports scoring failures in the body rather than through the status code:
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+
+    def close(self):
+        self.session.close()
+
+
+
+class UvicornBackend(HTTPBackend):
+    """
+    Runs the FastAPI app on localhost in a background thread of this process and calls it
+    over HTTP, as a stand-in for the deployed service.
+    """
+    name = "uvicorn"
+
+    def __init__(self, port=8765, startup_timeout=60.0, **kwargs):
+        import uvicorn
+        config = uvicorn.Config("api.routes:app", host="127.0.0.1", port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="prediction-api", daemon=True)
+        self.thread.start()
+
+        deadline = time.monotonic() + startup_timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"The local prediction API did not start on port {port}")
+            time.sleep(0.05)
+        super().__init__(f"http://127.0.0.1:{port}", **kwargs)
+
+
+    def close(self):
+        super().close()
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+
+def make_backend(config=PREDICTION_BACKEND_CONFIG):
+    """
+    Builds the prediction backend selected in the configuration.
+    """
+    backend = config["backend"]
+    http_options = {
+        "connect_timeout": config["connect_timeout"],
+        "read_timeout": config["read_timeout"],
+        "retries": config["retries"]
+    }
+    if backend == "local":
+        return LocalBackend()
+    if backend == "http":
+        return HTTPBackend(config["url"], **http_options)
+    if backend == "uvicorn":
+        return UvicornBackend(port=config["uvicorn_port"], **http_options)
+    raise ValueError(f"Unknown prediction backend '{backend}', expected 'local', 'http' or 'uvicorn'")
@@ -0,0 +1,154 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prediction requests for up to max_wait_ms or max_batch_size records,
+    runs them as one vectorized call on a dedicated executor and fans the results back out
+    to the waiting callers.
+
+    predict_fn takes a list of records and returns one result per record, in order. When it
+    raises on a batch, the records are scored again one by one, so only the callers whose own
+    record fails get the error.
+    """
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0, workers=1):
+        if max_batch_size < 1 or max_wait_ms < 0 or workers < 1:
+            raise ValueError("max_batch_size and workers must be positive and max_wait_ms non-negative")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers
+        self._queue = None
+        self._task = None
+        self._executor = None
+        self._slots = None
+        self._inflight = set()
+        self.batches = 0
+        self.records = 0
+        self.fallbacks = 0
+
+
+    async def start(self):
+        """Starts the collector task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predict-batch")
+        self._task = asyncio.create_task(self._collect())
+
+
+    async def stop(self):
+        """Stops collecting, lets running batches finish and fails whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction service is shutting down"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+    async def submit(self, record):
+        """Queues one record and waits for its result."""
+        if self._task is None:
+            raise RuntimeError("MicroBatcher has not been started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+
+    def stats(self):
+        """Batch counters, to check how well requests are being coalesced."""
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "avg_batch_size": self.records / self.batches if self.batches else 0.0,
+            "fallbacks": self.fallbacks
+        }
+
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Waiting for a free worker first lets requests pile up in the queue while every
+            # worker is busy, so the next batch picks all of them up at once:
+            await self._slots.acquire()
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except BaseException:
+                self._slots.release()
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Prediction service is shutting down"))
+                raise
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+
+    def _predict_one_by_one(self, records):
+        """
+        Scores each record on its own; returns (result, None) or (None, exception) per record.
+        """
+        outcomes = []
+        for record in records:
+            try:
+                outcomes.append((self.predict_fn([record])[0], None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        records = [record for record, _ in batch]
+        try:
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_fn, records)
+                outcomes = [(result, None) for result in results]
+            except Exception as e:
+                if len(records) == 1:
+                    outcomes = [(None, e)]
+                else:
+                    # One bad record must not fail the unrelated requests batched with it:
+                    self.fallbacks += 1
+                    outcomes = await loop.run_in_executor(self._executor, self._predict_one_by_one, records)
+            self.batches += 1
+            self.records += len(records)
+            for (_, future), (result, error) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
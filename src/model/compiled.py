@@ -0,0 +1,109 @@
+import numpy as np
+from src.model.encoder import FastEncoder
+
+
+# Rows evaluated per traversal step; bounds the (rows x trees) index matrix:
+ROW_BLOCK_SIZE = 4096
+
+
+
+class CompiledPipeline:
+    """
+    A flat-array copy of the fitted churn pipeline (ColumnTransformer + RandomForest).
+
+    The one-hot encoders are exported as per-column category lookup tables (FastEncoder) and
+    every tree is packed into shared feature/threshold/children/value arrays, so predict_proba
+    runs as a handful of vectorized NumPy steps instead of going through sklearn's per-call
+    validation and per-tree dispatch. Outputs match the sklearn pipeline to 1e-9.
+
+    The gain is in per-call overhead: single records and small micro-batches are many times
+    faster, while very large offline batches are still better served by sklearn's Cython trees.
+    """
+    def __init__(self, pipeline):
+        preprocessor = pipeline.named_steps['preprocessor']
+        forest = pipeline.named_steps['model']
+        self.classes_ = forest.classes_
+        self.encoder = FastEncoder(preprocessor)
+        (self.feature, self.threshold, self.children,
+         self.value, self.roots, self.max_depth) = _pack_forest(forest)
+
+
+    def transform(self, data):
+        """
+        Encodes a DataFrame or a list of dicts into the model's input matrix.
+        """
+        return self.encoder.transform(data)
+
+
+    def predict_proba_transformed(self, X):
+        """
+        Evaluates every tree on an already-encoded matrix.
+        """
+        # The forest compares float32 feature values against its thresholds, as sklearn does:
+        X = np.asarray(X, dtype=np.float32)
+        proba = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_BLOCK_SIZE):
+            block = np.ascontiguousarray(X[start:start + ROW_BLOCK_SIZE])
+            flat = block.ravel()
+            row_base = (np.arange(block.shape[0]) * block.shape[1])[:, None]
+            nodes = np.broadcast_to(self.roots, (block.shape[0], self.roots.shape[0]))
+            for _ in range(self.max_depth):
+                go_right = flat[row_base + self.feature[nodes]] > self.threshold[nodes]
+                nodes = self.children[2 * nodes + go_right]
+            proba[start:start + ROW_BLOCK_SIZE] = self.value[nodes].mean(axis=1)
+        return proba
+
+
+    def predict_proba(self, data):
+        return self.predict_proba_transformed(self.transform(data))
+
+
+    def predict(self, data):
+        return self.classes_[self.predict_proba(data).argmax(axis=1)]
+
+
+
+def compile_pipeline(pipeline):
+    """
+    Builds the flat-array predictor for a fitted churn pipeline.
+    """
+    return CompiledPipeline(pipeline)
+
+
+
+def _pack_forest(forest):
+    """
+    Concatenates the nodes of every tree into flat arrays. The children are interleaved
+    (left at 2 * node, right at 2 * node + 1) and leaves point to themselves, so a fixed number
+    of traversal steps (the deepest tree's depth) lands every row on a leaf.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError("Only single-output forests can be compiled")
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(value / normalizer)
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    children = np.stack([np.concatenate(lefts), np.concatenate(rights)], axis=1).ravel()
+    return (
+        np.concatenate(features).astype(np.intp),
+        np.concatenate(thresholds),
+        children.astype(np.intp),
+        np.concatenate(values),
+        np.asarray(roots, dtype=np.intp),
+        max_depth
+    )
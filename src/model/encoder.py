@@ -0,0 +1,129 @@
+import numpy as np
+from sklearn.preprocessing import OneHotEncoder
+
+
+
+class FastEncoder:
+    """
+    A precomputed copy of the fitted ColumnTransformer that writes records straight into a
+    NumPy matrix, without building a DataFrame or running the column-wise transform.
+
+    Every categorical field gets a category -> output column lookup table and the numeric
+    fields (tenure, monthly_charges, total_charges) are passed through to their output
+    position. The output matches preprocessor.transform exactly, including unknown
+    categories, which encode as all zeros (handle_unknown='ignore').
+    """
+    def __init__(self, preprocessor):
+        self.n_features = len(preprocessor.get_feature_names_out())
+        self.categorical, self.passthrough = export_preprocessor(preprocessor)
+        # Record-wise path: one lookup per field gives the absolute output column.
+        self.column_lookup = [
+            (column, {category: offset + index for category, index in lookup.items()})
+            for column, offset, lookup in self.categorical
+        ]
+
+
+    def encode_record(self, record, out=None):
+        """
+        Encodes one record (a dict) into a row. Pass out to reuse a preallocated row.
+        """
+        if out is None:
+            out = np.zeros(self.n_features, dtype=np.float64)
+        else:
+            out.fill(0.0)
+        for column, lookup in self.column_lookup:
+            position = lookup.get(record[column])
+            if position is not None:
+                out[position] = 1.0
+        for column, position in self.passthrough:
+            out[position] = record[column]
+        return out
+
+
+    def encode_records(self, records, out=None):
+        """
+        Encodes a list of records into a matrix. Pass out to reuse a preallocated matrix.
+        """
+        if out is None:
+            out = np.zeros((len(records), self.n_features), dtype=np.float64)
+        for i, record in enumerate(records):
+            self.encode_record(record, out=out[i])
+        return out
+
+
+    def encode_frame(self, data):
+        """
+        Encodes a DataFrame column by column, which is faster than the record path for large frames.
+        """
+        n_rows = len(data)
+        X = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        rows = np.arange(n_rows)
+        for column, offset, lookup in self.categorical:
+            codes = np.fromiter((lookup.get(v, -1) for v in data[column].tolist()), dtype=np.int64, count=n_rows)
+            known = codes >= 0
+            X[rows[known], offset + codes[known]] = 1.0
+        for column, position in self.passthrough:
+            X[:, position] = data[column].to_numpy(dtype=np.float64)
+        return X
+
+
+    def transform(self, data):
+        """
+        Encodes a DataFrame, a list of records or a single record.
+        """
+        if hasattr(data, "columns"):
+            return self.encode_frame(data)
+        if isinstance(data, dict):
+            return self.encode_record(data)[np.newaxis, :]
+        return self.encode_records(data)
+
+
+
+class EncodedPipeline:
+    """
+    Serves the saved sklearn pipeline through the FastEncoder: records are encoded directly
+    and only the fitted model step runs in sklearn.
+    """
+    def __init__(self, pipeline):
+        self.encoder = FastEncoder(pipeline.named_steps['preprocessor'])
+        self.final_model = pipeline.named_steps['model']
+        self.classes_ = self.final_model.classes_
+
+
+    def predict_proba(self, data):
+        return self.final_model.predict_proba(self.encoder.transform(data))
+
+
+    def predict(self, data):
+        return self.final_model.predict(self.encoder.transform(data))
+
+
+
+def export_preprocessor(preprocessor):
+    """
+    Returns (column, output offset, category -> index) for every one-hot encoded column and
+    (column, output position) for every passthrough column, in the transformer's output order.
+    """
+    input_names = list(preprocessor.feature_names_in_)
+    categorical = []
+    passthrough = []
+    position = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or len(columns) == 0:
+            continue
+        columns = [input_names[c] if isinstance(c, (int, np.integer)) else c for c in columns]
+        if transformer == 'passthrough':
+            for column in columns:
+                passthrough.append((column, position))
+                position += 1
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop_idx_ is not None or getattr(transformer, "infrequent_categories_", None):
+                raise ValueError(f"Transformer '{name}' uses dropped or infrequent categories, which cannot be precomputed")
+            if transformer.handle_unknown != 'ignore':
+                raise ValueError(f"Transformer '{name}' must use handle_unknown='ignore' to be precomputed")
+            for column, categories in zip(columns, transformer.categories_):
+                categorical.append((column, position, {c: i for i, c in enumerate(categories)}))
+                position += len(categories)
+        else:
+            raise ValueError(f"Transformer '{name}' ({type(transformer).__name__}) cannot be precomputed")
+    return categorical, passthrough
@@ -0,0 +1,253 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+from config import MODEL_MMAP_MODE, MODEL_WATCH_CONFIG, PREDICTOR
+from src.model.registry import MODEL_PATH, build_predictor, metadata_path, model_metadata, model_version
+from src.model.scoring import score_frame
+
+
+# Synthetic customers scored by a new version before it is swapped in:
+WARMUP_RECORDS = 8
+
+logger = logging.getLogger(__name__)
+
+
+
+class ServedModel:
+    """
+    One loaded model version with everything derived from it. A request takes one of these
+    when it starts and uses it to the end, so a swap never changes the model under it.
+    """
+    def __init__(self, path, pipeline, predictor, version, metadata):
+        self.path = path
+        self.pipeline = pipeline
+        self.predictor = predictor
+        self.version = version
+        self.metadata = metadata
+        self.loaded_at = time.time()
+        self.in_flight = 0
+        self._explainer_context = None
+        self._lock = threading.Lock()
+
+
+    def explainer_context(self):
+        """The SHAP ExplainerContext of this version, built on first use."""
+        if self._explainer_context is None:
+            from src.explainability.explainer import ExplainerContext
+            with self._lock:
+                if self._explainer_context is None:
+                    self._explainer_context = ExplainerContext(self.pipeline, version=self.version)
+        return self._explainer_context
+
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "trained_version": self.metadata.get("version"),
+            "loaded_at": self.loaded_at,
+            "in_flight": self.in_flight
+        }
+
+
+
+def warmup_records(pipeline, n_records=WARMUP_RECORDS):
+    """
+    Synthetic Input_features records that cycle through the categories the encoder knows.
+    """
+    from api.schemas import Input_features
+    from src.model.encoder import export_preprocessor
+    categorical, _ = export_preprocessor(pipeline.named_steps['preprocessor'])
+    records = []
+    for i in range(n_records):
+        record = {column: str(list(lookup)[i % len(lookup)]) for column, _, lookup in categorical}
+        tenure = 1 + 9 * i % 72
+        monthly_charges = 20.0 + 13.5 * i % 100
+        record.update(tenure=tenure, monthly_charges=monthly_charges, total_charges=round(tenure * monthly_charges, 2))
+        records.append(Input_features(**record).model_dump())
+    return records
+
+
+
+def load_served_model(path=MODEL_PATH, kind=PREDICTOR, mmap_mode=MODEL_MMAP_MODE):
+    """
+    Loads a model file, builds its predictor and warms it up on a few synthetic records, so
+    the first real request does not pay for it. Raises if the model cannot score them or the
+    file was replaced while it was being read.
+    """
+    version = model_version(path)
+    pipeline = joblib.load(path, mmap_mode=mmap_mode)
+    if model_version(path) != version:
+        raise RuntimeError(f"{path} changed while it was loaded")
+
+    predictor = build_predictor(pipeline, kind)
+    labels, probs = score_frame(predictor, warmup_records(pipeline))
+    if not np.all(np.isfinite(probs)) or not set(labels.tolist()) <= set(predictor.classes_.tolist()):
+        raise ValueError(f"Model version {version} produced invalid warm-up predictions")
+
+    return ServedModel(path, pipeline, predictor, version, matching_metadata(path, version))
+
+
+
+def matching_metadata(path, version):
+    """
+    The metadata of the model file if it describes this version. promote_model writes the
+    metadata of a new model before the model itself, so in between it belongs to the next one.
+    """
+    metadata = model_metadata(path)
+    return metadata if metadata.get("content_hash") in (None, version) else {}
+
+
+
+class ModelHolder:
+    """
+    Holds the model version the API serves and replaces it without a restart.
+
+    A watcher thread checks the model file every poll_interval seconds. When its content
+    changes, the new version is loaded and warmed up on that thread while requests keep
+    being served by the current one, then swapped in with a single reference assignment.
+    Requests take the version they run on through use(); a replaced version stays alive
+    until its last in-flight request has finished. A file that fails to load is logged and
+    skipped until it changes again.
+
+    A new model has to be moved into place with a rename (os.replace, as promote_model in
+    ml/train.py does), never written over the old file: with MODEL_MMAP_MODE the served
+    version reads its tree arrays straight from the file it was loaded from.
+    """
+    def __init__(self, path=MODEL_PATH, kind=PREDICTOR, poll_interval=MODEL_WATCH_CONFIG["poll_interval"]):
+        self.path = path
+        self.kind = kind
+        self.poll_interval = poll_interval
+        self._signature = self._file_signature()
+        self._current = load_served_model(path, kind)
+        self._retired = []
+        self._failed_signature = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"swaps": 0, "failed_loads": 0, "last_error": None, "last_check": None}
+
+
+    @property
+    def current(self):
+        """The version new requests are served by."""
+        return self._current
+
+
+    @contextmanager
+    def use(self):
+        """
+        Pins the current version for the duration of a request.
+        """
+        with self._lock:
+            served = self._current
+            served.in_flight += 1
+        try:
+            yield served
+        finally:
+            with self._lock:
+                served.in_flight -= 1
+                self._retired = [old for old in self._retired if old.in_flight > 0]
+
+
+    def swap(self, served):
+        """
+        Makes served the current version. The replaced one is kept while requests use it.
+        """
+        with self._lock:
+            previous = self._current
+            self._current = served
+            if previous.in_flight > 0:
+                self._retired.append(previous)
+            self._stats["swaps"] += 1
+        logger.info("Swapped model %s -> %s (%d requests still on the old version)",
+                    previous.version, served.version, previous.in_flight)
+
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.path, metadata_path(self.path)):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+
+    def check(self):
+        """
+        Loads and swaps in the model file if it changed since the last check. Returns True
+        when a new version was swapped in.
+        """
+        self._stats["last_check"] = time.time()
+        signature = self._file_signature()
+        if signature == self._signature or signature == self._failed_signature:
+            return False
+
+        try:
+            if model_version(self.path) == self._current.version:
+                # Same model, only the metadata file moved on (possibly ahead of a new model):
+                metadata = matching_metadata(self.path, self._current.version)
+                if metadata:
+                    self._current.metadata = metadata
+                self._signature = signature
+                return False
+            served = load_served_model(self.path, self.kind)
+        except Exception as e:
+            self._failed_signature = signature
+            self._stats["failed_loads"] += 1
+            self._stats["last_error"] = f"{type(e).__name__}: {e}"
+            logger.exception("Could not load the new model from %s; still serving %s", self.path, self._current.version)
+            return False
+
+        self._signature = signature
+        self._failed_signature = None
+        self.swap(served)
+        return True
+
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+
+    def start(self):
+        """Starts the watcher thread (unless poll_interval is 0)."""
+        if self.poll_interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """Stops the watcher thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    def describe(self):
+        """
+        The served version with its training metadata, the replaced versions still finishing
+        requests, and the swap counters.
+        """
+        with self._lock:
+            served = self._current
+            draining = [old.describe() for old in self._retired]
+            stats = dict(self._stats)
+        return {
+            **served.describe(),
+            "path": self.path,
+            "predictor": self.kind,
+            "metadata": served.metadata,
+            "draining": draining,
+            "poll_interval": self.poll_interval,
+            **stats
+        }
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+
+import joblib
+import psutil
+from config import MODEL_MMAP_MODE, PREDICTOR
+
+
+MODEL_PATH = "ml/churn_clf_model.pkl"
+
+logger = logging.getLogger(__name__)
+
+# Process-wide caches, keyed by (absolute path, mmap mode):
+_models = {}
+_explainer_contexts = {}
+_predictors = {}
+_load_stats = {}
+_lock = threading.Lock()
+
+
+
+@lru_cache(maxsize=8)
+def _file_digest(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+
+def model_version(path=MODEL_PATH):
+    """
+    A short content hash of the model file. It changes whenever a new model is saved, so
+    anything cached against the model can be keyed by it.
+    """
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_mtime_ns, stat.st_size)
+
+
+
+def loaded_model_version(path=MODEL_PATH, mmap_mode=MODEL_MMAP_MODE):
+    """
+    The version of the model this process loaded from path, or None before it is loaded.
+    Unlike model_version() it does not move when a newer model is promoted to path, so it is
+    what results computed by the loaded model have to be keyed by.
+    """
+    stats = _load_stats.get((os.path.abspath(path), mmap_mode))
+    return stats["version"] if stats else None
+
+
+
+def metadata_path(path=MODEL_PATH):
+    """
+    The metadata file kept next to a promoted model (ml/churn_clf_model.json).
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+
+def model_metadata(path=MODEL_PATH):
+    """
+    The training metrics of the promoted model (version, watermark, holdout scores, ...), or
+    an empty dict for a model saved without them, such as the notebook's.
+    """
+    try:
+        with open(metadata_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+
+def load_model(path=MODEL_PATH, mmap_mode=MODEL_MMAP_MODE):
+    """
+    Returns the saved pipeline, loading it on first use and caching it for the whole process.
+
+    With mmap_mode='r' the NumPy arrays stored in the file are memory-mapped instead of copied
+    onto the heap, so worker processes loading the same file share them through the OS page
+    cache. This only applies to uncompressed joblib dumps; compressed ones are loaded normally.
+    """
+    key = (os.path.abspath(path), mmap_mode)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        if key not in _models:
+            process = psutil.Process()
+            rss_before = process.memory_info().rss
+            version = model_version(path)
+            start = time.perf_counter()
+            model = joblib.load(path, mmap_mode=mmap_mode)
+            load_seconds = time.perf_counter() - start
+            rss_after = process.memory_info().rss
+
+            _models[key] = model
+            _load_stats[key] = {
+                "path": path,
+                "version": version,
+                "mmap_mode": mmap_mode,
+                "load_seconds": load_seconds,
+                "rss_delta_mb": (rss_after - rss_before) / 2**20,
+                "rss_mb": rss_after / 2**20,
+                "file_mb": os.path.getsize(path) / 2**20
+            }
+            logger.info(
+                "Loaded model %s (version %s, mmap_mode=%s) in %.2fs; resident size +%.1f MB (process %.1f MB)",
+                path, _load_stats[key]["version"], mmap_mode, load_seconds,
+                _load_stats[key]["rss_delta_mb"], _load_stats[key]["rss_mb"]
+            )
+    return _models[key]
+
+
+
+def get_explainer_context(path=MODEL_PATH, mmap_mode=MODEL_MMAP_MODE):
+    """
+    Returns the ExplainerContext of the cached model, building it once per process.
+    """
+    key = (os.path.abspath(path), mmap_mode)
+    context = _explainer_contexts.get(key)
+    if context is None:
+        from src.explainability.explainer import ExplainerContext
+        model = load_model(path, mmap_mode)
+        with _lock:
+            if key not in _explainer_contexts:
+                _explainer_contexts[key] = ExplainerContext(model, version=_load_stats[key]["version"])
+            context = _explainer_contexts[key]
+    return context
+
+
+
+def get_predictor(kind=PREDICTOR, path=MODEL_PATH, mmap_mode=MODEL_MMAP_MODE):
+    """
+    Returns the inference engine of the cached model, built once per process: "sklearn"
+    (the fitted model behind the precomputed FastEncoder) or "compiled" (the flat-array copy
+    of the pipeline).
+    """
+    key = (os.path.abspath(path), mmap_mode, kind)
+    predictor = _predictors.get(key)
+    if predictor is None:
+        if kind not in ("sklearn", "compiled"):
+            raise ValueError(f"Unknown predictor '{kind}', expected 'sklearn' or 'compiled'")
+        model = load_model(path, mmap_mode)
+        with _lock:
+            if key not in _predictors:
+                _predictors[key] = build_predictor(model, kind)
+            predictor = _predictors[key]
+    return predictor
+
+
+
+def build_predictor(model, kind=PREDICTOR):
+    """
+    Builds the inference engine of a fitted pipeline, uncached.
+    """
+    if kind == "compiled":
+        from src.model.compiled import compile_pipeline
+        return compile_pipeline(model)
+    if kind == "sklearn":
+        from src.model.encoder import EncodedPipeline
+        return EncodedPipeline(model)
+    raise ValueError(f"Unknown predictor '{kind}', expected 'sklearn' or 'compiled'")
+
+
+
+def model_load_stats():
+    """
+    Load time and resident size of every model loaded by this process.
+    """
+    return list(_load_stats.values())
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+
+def score_frame(model, input_data):
+    """
+    Runs a single predict_proba pass over the input rows and derives the labels from it.
+    Returns the predicted labels and the probability of the predicted label for every row.
+    """
+    pred_prob = model.predict_proba(input_data)
+    best = pred_prob.argmax(axis=1)
+    labels = model.classes_[best]
+    probs = pred_prob[np.arange(len(best)), best]
+    return labels, probs
+
+
+
+def records_to_frame(records):
+    """
+    Builds one DataFrame from a list of Input_features (or plain dicts).
+    """
+    return pd.DataFrame([r.model_dump() if hasattr(r, "model_dump") else r for r in records])
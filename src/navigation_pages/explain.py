@@ -1,14 +1,27 @@
 import pandas as pd
-import joblib
 import streamlit as st
-from src.components.charts import create_clean_shap_dashboard, show_shap_top_features
+from config import EXPLANATION_CACHE_CONFIG
+from src.components.charts import render_shap_dashboard, show_shap_top_features
+from src.explainability.cache import ExplanationCache, explanation_key
+from src.explainability.explainer import compute_explanation
+from src.model.registry import get_explainer_context, loaded_model_version, model_version
 
 
-try:
-    model = joblib.load("ml/churn_clf_model.pkl")
-except Exception as e:
-    st.error(f"Failed to load model: {e}")
-    st.stop()
+@st.cache_resource(show_spinner="Loading model...")
+def load_explainer_context():
+    """
+    The model and its ExplainerContext, loaded on the first visit to this page rather than
+    when the app starts, and then shared by every session.
+    """
+    return get_explainer_context()
+
+@st.cache_resource
+def get_explanation_cache():
+    """
+    One explanation cache per process, shared by every session.
+    """
+    return ExplanationCache(**EXPLANATION_CACHE_CONFIG)
+
 
 def navigate_to_predict():
     st.session_state.navigation_target = "📊 Predict"
@@ -39,9 +52,31 @@ def explain():
             customer_data = pd.DataFrame.from_dict(
                 {k: [v] for k, v in st.session_state.input_features.items()}
             )
-            result = create_clean_shap_dashboard(customer_data=customer_data, model=model)
+            cache = get_explanation_cache()
+            # Keyed by the model this process explains with, which stays loaded after a newer
+            # one is promoted; before the first load, that is the model on disk:
+            version = loaded_model_version() or model_version()
+            key = explanation_key(st.session_state.input_features, version)
+            cached = cache.get(key)
+            if cached is None:
+                # The model is only loaded once an explanation actually has to be computed:
+                explainer_context = load_explainer_context()
+                key = explanation_key(st.session_state.input_features, explainer_context.version)
+                explanation = compute_explanation(customer_data=customer_data, model=explainer_context.model,
+                                                  explainer_context=explainer_context)
+                cached = {
+                    "prediction": explanation["prediction"],
+                    "churn_probability": explanation["churn_probability"],
+                    "base_value": explanation["base_value"],
+                    "agg_shap": {k: float(v) for k, v in explanation["agg_shap"].items()},
+                    "customer_values": explanation["customer_values"]
+                }
+                cache.put(key, cached)
+            # A hit and a miss give the same result, SHAP values aggregated per feature:
+            result = dict(cached, shap_values=cached["agg_shap"], customer_data=customer_data)
             st.session_state.update({
                 "shap_result": result,
+                "explanation_key": key,
                 "customer_data": customer_data,
                 "shap_values": result["shap_values"],
                 "last_input_features": st.session_state.input_features.copy()
@@ -70,7 +105,7 @@ def explain():
         st.session_state.non_churn_prob = stay_probability
     
     st.subheader("Feature Impact Analysis of all the features")
-    st.pyplot(result["plot"])
+    st.image(render_shap_dashboard(st.session_state.explanation_key, result), use_container_width=True)
     
     st.session_state.update({
         "shap_values" : result["agg_shap"],
@@ -80,3 +115,7 @@ def explain():
     st.write("")
     show_shap_top_features()
 
+    stats = get_explanation_cache().stats()
+    st.caption(f"Explanation cache: {stats['memory_hits'] + stats['disk_hits']} hits, "
+               f"{stats['misses']} misses ({stats['hit_rate'] * 100:.0f}% hit rate)")
+
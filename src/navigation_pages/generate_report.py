@@ -1,9 +1,7 @@
 import streamlit as st  
-from llm.report import get_report
-from llm.pdf_generator import save_report_as_pdf
+from llm.report import AUDIENCES, REPORT_TYPES, get_report
+from llm.pdf_generator import render_report_pdf
 from datetime import datetime
-import os 
-import time
 
 def navigate_to_predict():
     st.session_state.navigation_target = "📊 Predict"
@@ -57,13 +55,13 @@ def report_generation():
     with col1:
         report_type = st.selectbox(
             "Report Type",
-            ["Executive Summary", "Detailed Analysis", "Technical Deep Dive", "Action Plan"]
+            REPORT_TYPES
         )
     
     with col2:
         audience = st.selectbox(
             "Target Audience",
-            ["Management", "Customer Service Team", "Technical Team", "Marketing Team"]
+            AUDIENCES
         )
     
     include_recommendations = st.checkbox("Include Actionable Recommendations", value=True)
@@ -80,25 +78,26 @@ def report_generation():
                     include_recommendations=include_recommendations
                     )      
             st.session_state.report_content = response
+        timing = st.session_state.report_timing
+        if timing["cached"]:
+            st.caption(f"Served from the report cache in {timing['total_ms']:.0f} ms")
+        else:
+            st.caption(f"First token after {timing['ttft_ms']:.0f} ms, full report in {timing['total_ms']:.0f} ms")
             
 
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         pdf_filename = f"Customer_churn_report_{timestamp}.pdf"
-        pdf_path = save_report_as_pdf(report_text=st.session_state.report_content, pdf_filename=pdf_filename)
-        if pdf_path is not None and os.path.exists(pdf_path):
-            st.session_state.pdf_path = pdf_path
-            time.sleep(2)
-            with open(pdf_path, "rb") as file:
-                st.download_button(
-                    label="📥 Download as PDF",
-                    data=file,
-                    file_name=pdf_filename,
-                    mime="application/pdf",
-                    key="download_pdf"
-                )
+        pdf_file = render_report_pdf(st.session_state.report_content)
+        if pdf_file is not None:
+            st.download_button(
+                label="📥 Download as PDF",
+                data=pdf_file,
+                file_name=pdf_filename,
+                mime="application/pdf",
+                key="download_pdf"
+            )
         else:
             st.error("⚠️ Failed to generate the PDF report. Please try again.")
-            st.write("Debug info - pdf_path:", pdf_path)
 
 
 
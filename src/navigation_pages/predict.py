@@ -1,17 +1,18 @@
 import streamlit as st 
-import requests
-import joblib
 from src.components.charts import display_customer_health_dashboard
+from src.model.backends import make_backend
 import pandas as pd
 import time
 
     
 
-try:
-    model = joblib.load("ml/churn_clf_model.pkl")
-except Exception as e:
-    st.error(f"Failed to load model: {e}")
-    st.stop()
+@st.cache_resource(show_spinner="Connecting to the prediction backend...")
+def get_prediction_backend():
+    """
+    One prediction backend per process (configured in PREDICTION_BACKEND_CONFIG), so its
+    model or HTTP connection pool is shared by every session.
+    """
+    return make_backend()
 
 
 def predict():
@@ -39,6 +40,7 @@ def predict():
          
     
     if st.session_state.display_customer_health_dashboard:
+        st.caption(st.session_state.get("prediction_latency", ""))
         display_customer_health_dashboard(*st.session_state.dashboard_data)
         st.subheader("Given Input Features")
         df = pd.DataFrame([st.session_state.input_features]).T.reset_index()
@@ -122,8 +124,17 @@ def predict():
       
         # Sending data to FastAPI for prediction
         if st.button("Predict Churn"):
-            res = requests.post(url="https://end-to-end-customer-churn-prediction-8ftp.onrender.com/predict", json=input_features)
-            if res.status_code == 200:
+            backend = get_prediction_backend()
+            start = time.perf_counter()
+            try:
+                res = backend.predict(input_features)
+            except Exception as e:
+                res = None
+                st.error(f"Prediction failed ({backend.name} backend): {e}")
+            latency_ms = (time.perf_counter() - start) * 1000
+            if res is not None:
+                st.session_state.prediction_latency = f"Prediction backend: {backend.name} ({latency_ms:.1f} ms)"
+                st.caption(st.session_state.prediction_latency)
                 display_customer_health_dashboard(res=res, input_features=input_features)
                 st.write("")
                 st.write("")
@@ -0,0 +1,96 @@
+import socket
+
+import pytest
+from benchmarks.fake_openai import make_app, serve_in_thread
+
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+
+@pytest.fixture
+def fake_openai():
+    """
+    Starts the fake OpenAI server with the given make_app options and returns its app (which
+    counts the requests) and base URL. Every server is stopped after the test.
+    """
+    servers = []
+
+    def start(**options):
+        app = make_app(**{"chunk_delay": 0.0, "first_token_delay": 0.0, **options})
+        port = free_port()
+        servers.append(serve_in_thread(app, port))
+        return app, f"http://127.0.0.1:{port}/v1"
+
+    yield start
+    for server in servers:
+        server.should_exit = True
+
+
+
+@pytest.fixture
+def report_cache(tmp_path, monkeypatch):
+    """A fresh report cache in a temporary directory, used by llm.report for this test."""
+    import llm.report
+    from llm.report_cache import ReportCache
+    cache = ReportCache(str(tmp_path / "reports.sqlite"))
+    monkeypatch.setattr(llm.report, "_report_cache", cache)
+    return cache
+
+
+
+# Categories of the customer table's text columns, as offered on the Predict page:
+CATEGORIES = {
+    "gender": ["Female", "Male"],
+    "senior_citizen": ["0", "1"],
+    "partner": ["No", "Yes"],
+    "dependents": ["No", "Yes"],
+    "phone_service": ["No", "Yes"],
+    "multiple_lines": ["No", "No phone service", "Yes"],
+    "internet_service": ["DSL", "Fiber optic", "No"],
+    "online_security": ["No", "No internet service", "Yes"],
+    "online_backup": ["No", "No internet service", "Yes"],
+    "device_protection": ["No", "No internet service", "Yes"],
+    "tech_support": ["No", "No internet service", "Yes"],
+    "streaming_tv": ["No", "No internet service", "Yes"],
+    "streaming_movies": ["No", "No internet service", "Yes"],
+    "contract": ["Month-to-month", "One year", "Two year"],
+    "paperless_billing": ["No", "Yes"],
+    "payment_method": ["Bank transfer (automatic)", "Credit card (automatic)", "Electronic check", "Mailed check"]
+}
+
+
+
+def customer_table(n_rows, seed=0):
+    """
+    A synthetic customer table with the columns of the real one, where short month-to-month
+    contracts churn more often, so a forest has something to learn.
+    """
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    data = {"customer_id": [f"TEST-{i:05d}" for i in range(n_rows)]}
+    data.update({column: rng.choice(categories, n_rows) for column, categories in CATEGORIES.items()})
+    data["tenure"] = rng.integers(1, 73, n_rows)
+    data["monthly_charges"] = np.round(rng.uniform(18.95, 130.0, n_rows), 2)
+    data["total_charges"] = np.round(data["tenure"] * data["monthly_charges"], 2)
+    churn_prob = 0.1 + 0.4 * (data["contract"] == "Month-to-month") + 0.3 * (data["tenure"] < 12)
+    data["churn"] = np.where(rng.random(n_rows) < churn_prob, "Yes", "No")
+    return pd.DataFrame(data)
+
+
+
+@pytest.fixture(scope="session")
+def churn_pipeline():
+    """
+    A small fitted pipeline built like the saved model (ml/train.py), on a synthetic table.
+    """
+    from ml.train import build_pipeline, split_target
+    X, y = split_target(customer_table(600))
+    pipeline = build_pipeline(X, {"n_estimators": 20, "max_depth": 8, "class_weight": "balanced"})
+    pipeline.named_steps['model'].set_params(n_jobs=1)
+    return pipeline.fit(X, y)
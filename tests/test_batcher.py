@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from src.model.batcher import MicroBatcher
+
+
+
+def double_or_fail(records):
+    """Fails the whole batch when any record is negative, like a vectorized scorer would."""
+    if any(record < 0 for record in records):
+        raise ValueError(f"negative record in {records}")
+    return [record * 2 for record in records]
+
+
+
+async def submit_all(batcher, records):
+    await batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(record) for record in records), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+
+
+def test_concurrent_records_are_scored_in_one_batch():
+    batcher = MicroBatcher(double_or_fail, max_batch_size=8, max_wait_ms=50)
+    results = asyncio.run(submit_all(batcher, [1, 2, 3, 4]))
+
+    assert results == [2, 4, 6, 8]
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["fallbacks"] == 0
+
+
+
+def test_a_failing_record_only_fails_its_own_request():
+    batcher = MicroBatcher(double_or_fail, max_batch_size=8, max_wait_ms=50)
+    results = asyncio.run(submit_all(batcher, [1, -2, 3, 4]))
+
+    assert results[0] == 2 and results[2:] == [6, 8]
+    assert isinstance(results[1], ValueError) and "[-2]" in str(results[1])
+    assert batcher.stats()["fallbacks"] == 1
+
+
+
+def test_a_single_record_error_is_raised_as_is():
+    batcher = MicroBatcher(double_or_fail, max_batch_size=1, max_wait_ms=0)
+    results = asyncio.run(submit_all(batcher, [-1]))
+
+    assert isinstance(results[0], ValueError)
+    assert batcher.stats()["fallbacks"] == 0
+
+
+
+def test_submit_requires_start():
+    with pytest.raises(RuntimeError):
+        asyncio.run(MicroBatcher(double_or_fail).submit(1))
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from benchmarks.fake_openai import CANNED_REPORT
+from llm.bulk_reports import BulkReportGenerator, TokenBucket
+from llm.report import MODEL
+from llm.report_cache import report_key
+
+
+
+def customer_jobs(n, marker=""):
+    return [(f"customer-{i}", [{"role": "user", "content": f"Report on customer {i}.{marker if i == 1 else ''}"}])
+            for i in range(n)]
+
+
+
+def generator_for(base_url, **options):
+    from openai import AsyncOpenAI
+    client = AsyncOpenAI(base_url=base_url, api_key="fake-key", max_retries=0)
+    return BulkReportGenerator(client=client, **{"base_delay": 0.01, **options})
+
+
+
+def test_backoff_is_jittered_and_capped():
+    generator = BulkReportGenerator(client=object(), base_delay=1.0, max_delay=4.0)
+    error = RuntimeError("connection reset")
+    for attempt in range(6):
+        delays = [generator._backoff(attempt, error) for _ in range(200)]
+        cap = min(4.0, 2 ** attempt)
+        assert all(0 <= delay <= cap for delay in delays)
+        assert len(set(delays)) > 1
+
+
+
+def test_backoff_honours_retry_after():
+    generator = BulkReportGenerator(client=object(), base_delay=0.01, max_delay=0.1)
+    error = SimpleNamespace(response=SimpleNamespace(headers={"retry-after": "3"}))
+    assert all(generator._backoff(attempt, error) >= 3 for attempt in range(5))
+    error.response.headers = {"retry-after": "soon"}
+    assert generator._backoff(0, error) <= 0.01
+
+
+
+def test_rate_limited_requests_are_retried_after_retry_after(fake_openai, report_cache, tmp_path):
+    app, base_url = fake_openai(rate_limit_ratio=0.5, retry_after="0.2", seed=3)
+    generator = generator_for(base_url, concurrency=1, max_retries=10)
+
+    start = time.perf_counter()
+    results = asyncio.run(generator.run(customer_jobs(6), str(tmp_path)))
+    elapsed = time.perf_counter() - start
+
+    assert all(path is not None and os.path.exists(path) for path in results.values())
+    assert generator.stats["generated"] == 6 and generator.stats["failed"] == 0
+    assert generator.stats["rate_limited"] == generator.stats["retries"] == app.state.rate_limited > 0
+    # One request at a time, each retry waits at least the server's Retry-After:
+    assert elapsed >= 0.2 * app.state.rate_limited
+
+
+
+def test_token_bucket_paces_acquires():
+    async def scenario():
+        bucket = TokenBucket(rate_per_minute=1200)  # 20 per second, 1200 at most
+        start = time.perf_counter()
+        await bucket.acquire(1200)
+        drained = time.perf_counter() - start
+        await bucket.acquire(10)
+        paced = time.perf_counter() - start - drained
+        # Booking 10 more than estimated has to be paid back before the next acquire:
+        bucket.settle(10)
+        start = time.perf_counter()
+        await bucket.acquire(1)
+        settled = time.perf_counter() - start
+        return drained, paced, settled
+
+    drained, paced, settled = asyncio.run(scenario())
+    assert drained < 0.05
+    assert 0.4 <= paced <= 0.8
+    assert 0.45 <= settled <= 0.9
+
+
+
+def test_token_bucket_rejects_a_zero_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+
+def test_one_failed_customer_does_not_stop_the_others(fake_openai, report_cache, tmp_path):
+    app, base_url = fake_openai(reject_marker="REJECT")
+    generator = generator_for(base_url, concurrency=4)
+
+    results = asyncio.run(generator.run(customer_jobs(5, marker=" REJECT"), str(tmp_path)))
+
+    assert results["customer-1"] is None
+    assert all(os.path.exists(results[name]) for name in results if name != "customer-1")
+    assert generator.stats["failed"] == 1 and generator.stats["generated"] == 4
+    # A 400 is not retried:
+    assert app.state.requests == 5
+
+
+
+def test_cached_reports_skip_the_network(fake_openai, report_cache, tmp_path):
+    app, base_url = fake_openai()
+    jobs = customer_jobs(4)
+    for _, messages in jobs[:3]:
+        report_cache.put(report_key(messages, MODEL), "A cached report.")
+    generator = generator_for(base_url)
+
+    results = asyncio.run(generator.run(jobs, str(tmp_path)))
+
+    assert all(path is not None for path in results.values())
+    assert generator.stats["cached"] == 3 and generator.stats["generated"] == 1
+    assert app.state.requests == 1
+    assert report_cache.get(report_key(jobs[3][1], MODEL)) == CANNED_REPORT
@@ -0,0 +1,99 @@
+import pandas as pd
+import psycopg2
+import pytest
+from config import DB_CONFIG
+from src.data_processing.churn_summary import BACKFILL_CHURN_SUMMARY, CREATE_CHURN_SUMMARY, ChurnDistributionCache
+
+
+
+class Source:
+    """A churn distribution and its change counter, counting how often each is read."""
+    def __init__(self):
+        self.version = 1
+        self.version_reads = 0
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return pd.DataFrame({"churn": ["No", "Yes"], "count": [100, self.version]})
+
+    def read_version(self):
+        self.version_reads += 1
+        return self.version
+
+
+
+def test_counts_are_reloaded_only_when_the_counter_moves():
+    source = Source()
+    cache = ChurnDistributionCache(source.load, source.read_version, ttl=3600)
+    first = cache.get()
+
+    assert cache.get() is first and source.version_reads == 1
+    assert cache.get(refresh=True) is first and source.version_reads == 2 and source.loads == 1
+
+    source.version = 2
+    assert cache.get() is first
+    assert cache.get(refresh=True)["count"].tolist() == [100, 2]
+    assert source.loads == cache.reloads == 2
+
+
+
+def test_counter_is_checked_again_after_the_ttl():
+    source = Source()
+    cache = ChurnDistributionCache(source.load, source.read_version, ttl=0)
+    cache.get()
+    source.version = 2
+
+    assert cache.get()["count"].tolist() == [100, 2]
+    assert source.version_reads == 2
+
+
+
+@pytest.fixture
+def scratch_customer_table():
+    """
+    A customer table in a throw-away schema of the configured database, with the summary
+    triggers installed. Everything is rolled back afterwards; skipped without a database.
+    """
+    try:
+        conn = psycopg2.connect(**DB_CONFIG, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no PostgreSQL database to test the triggers on: {e}")
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE SCHEMA churn_summary_test; SET LOCAL search_path TO churn_summary_test;")
+            cursor.execute("CREATE TABLE customer (customer_id TEXT PRIMARY KEY, churn TEXT, tenure INT);")
+            cursor.execute(CREATE_CHURN_SUMMARY)
+            cursor.execute(BACKFILL_CHURN_SUMMARY)
+            yield cursor
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+
+def summary(cursor):
+    cursor.execute("SELECT churn, count FROM churn_summary WHERE count <> 0 ORDER BY churn;")
+    counts = dict(cursor.fetchall())
+    cursor.execute("SELECT version FROM churn_summary_version;")
+    return counts, cursor.fetchone()[0]
+
+
+
+def test_triggers_apply_each_statement_once(scratch_customer_table):
+    cursor = scratch_customer_table
+    _, version = summary(cursor)
+
+    cursor.execute("INSERT INTO customer SELECT 'C' || i, CASE WHEN i % 4 = 0 THEN 'Yes' ELSE 'No' END, i "
+                   "FROM generate_series(1, 1000) AS i;")
+    assert summary(cursor) == ({"No": 750, "Yes": 250}, version + 1)
+
+    cursor.execute("UPDATE customer SET churn = 'Yes' WHERE tenure <= 10 AND churn = 'No';")
+    assert summary(cursor) == ({"No": 742, "Yes": 258}, version + 2)
+
+    # An update that leaves every churn value as it was does not move the counter:
+    cursor.execute("UPDATE customer SET tenure = tenure + 1;")
+    assert summary(cursor) == ({"No": 742, "Yes": 258}, version + 2)
+
+    cursor.execute("DELETE FROM customer WHERE churn = 'Yes';")
+    assert summary(cursor) == ({"No": 742}, version + 3)
@@ -0,0 +1,41 @@
+import numpy as np
+import src.model.compiled
+from src.model.compiled import compile_pipeline
+from tests.conftest import customer_table
+
+
+
+def test_compiled_probabilities_match_the_pipeline(churn_pipeline):
+    features = customer_table(300, seed=1).drop(columns=["customer_id", "churn"])
+    compiled = compile_pipeline(churn_pipeline)
+
+    expected = churn_pipeline.predict_proba(features)
+    np.testing.assert_allclose(compiled.predict_proba(features), expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(compiled.predict_proba(features.to_dict("records")), expected, rtol=0, atol=1e-9)
+    assert (compiled.predict(features) == churn_pipeline.predict(features)).all()
+    assert (compiled.classes_ == churn_pipeline.classes_).all()
+
+
+
+def test_unknown_categories_score_like_the_pipeline(churn_pipeline):
+    features = customer_table(50, seed=2).drop(columns=["customer_id", "churn"])
+    features.loc[::2, "contract"] = "Three year"
+    features.loc[::3, "payment_method"] = "Cash"
+    compiled = compile_pipeline(churn_pipeline)
+
+    np.testing.assert_allclose(compiled.predict_proba(features), churn_pipeline.predict_proba(features),
+                               rtol=0, atol=1e-9)
+    record = dict(features.iloc[0])
+    np.testing.assert_allclose(compiled.predict_proba([record]), churn_pipeline.predict_proba(features.iloc[:1]),
+                               rtol=0, atol=1e-9)
+
+
+
+def test_batches_larger_than_a_row_block_match(churn_pipeline, monkeypatch):
+    # Several blocks, the last one partial:
+    monkeypatch.setattr(src.model.compiled, "ROW_BLOCK_SIZE", 64)
+    features = customer_table(200, seed=3).drop(columns=["customer_id", "churn"])
+    compiled = compile_pipeline(churn_pipeline)
+
+    np.testing.assert_allclose(compiled.predict_proba(features), churn_pipeline.predict_proba(features),
+                               rtol=0, atol=1e-9)
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import psycopg2
+import pytest
+import src.data_processing.database as database
+from src.data_processing.database import ConnectionPool, PoolTimeout
+
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = -1
+        self.description = [("customer_id",), ("churn",)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        if self.conn.broken:
+            self.conn.closed = 2
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.conn.queries.append(query)
+        self.rowcount = 1
+
+    def fetchall(self):
+        return [("7590-VHVEG", "No")]
+
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for the pool: cursor, rollback, close."""
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+
+    def close(self):
+        self.closed = 1
+
+
+
+class FakeFactory:
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self):
+        self.connections.append(FakeConnection())
+        return self.connections[-1]
+
+
+
+@pytest.fixture
+def factory():
+    return FakeFactory()
+
+
+
+def test_checkout_reuses_returned_connections(factory):
+    pool = ConnectionPool(factory, minconn=1, maxconn=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+
+    other = pool.getconn()
+    assert other is not conn
+    pool.putconn(other)
+    pool.putconn(conn)
+
+    metrics = pool.metrics()
+    assert metrics["checkouts"] == 3 and metrics["connects"] == 2
+    assert metrics["idle"] == 2 and metrics["waits"] == 0 and metrics["reconnects"] == 0
+
+
+
+def test_stale_connection_is_replaced_on_checkout(factory):
+    pool = ConnectionPool(factory, minconn=1, maxconn=1)
+    stale = factory.connections[0]
+    stale.broken = True
+
+    conn = pool.getconn()
+    assert conn is not stale and stale.closed
+    assert pool.metrics()["reconnects"] == 1
+    pool.putconn(conn)
+
+
+
+def test_broken_connection_is_not_returned_to_the_pool(factory):
+    pool = ConnectionPool(factory, minconn=0, maxconn=1)
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as conn:
+            conn.broken = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+    assert conn.closed and pool.metrics()["idle"] == 0
+    # Its slot was released:
+    pool.putconn(pool.getconn())
+
+
+
+def test_saturated_pool_times_out_and_counts_the_wait(factory):
+    pool = ConnectionPool(factory, minconn=0, maxconn=1, checkout_timeout=0.1)
+    held = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+
+    metrics = pool.metrics()
+    assert metrics["waits"] == 1 and metrics["timeouts"] == 1
+    assert metrics["wait_time"] >= 0.1 and metrics["avg_wait_time"] >= 0.1
+    pool.putconn(held)
+
+
+
+def test_waiting_checkout_gets_the_released_connection(factory):
+    pool = ConnectionPool(factory, minconn=0, maxconn=1, checkout_timeout=5)
+    held = pool.getconn()
+    threading.Timer(0.1, pool.putconn, args=(held,)).start()
+
+    assert pool.getconn() is held
+    metrics = pool.metrics()
+    assert metrics["waits"] == 1 and metrics["timeouts"] == 0 and metrics["wait_time"] >= 0.05
+
+
+
+@pytest.fixture
+def query_pool(factory, monkeypatch):
+    """execute_query running on a fake pool, with its Streamlit messages collected."""
+    pool = ConnectionPool(factory, minconn=1, maxconn=1, checkout_timeout=0.1)
+    errors = []
+    monkeypatch.setattr(database, "get_pool", lambda: pool)
+    monkeypatch.setattr(database.st, "error", errors.append)
+    return pool, errors
+
+
+
+def test_query_is_retried_once_on_a_dropped_connection(factory, query_pool, monkeypatch):
+    pool, errors = query_pool
+    original_execute = FakeCursor.execute
+    calls = []
+
+    def drop_first(cursor, query):
+        calls.append(query)
+        cursor.conn.broken = len(calls) == 1
+        original_execute(cursor, query)
+
+    monkeypatch.setattr(FakeCursor, "execute", drop_first)
+    rows, columns = database.execute_query("SELECT * FROM customer;")
+
+    assert rows == [("7590-VHVEG", "No")] and columns == ["customer_id", "churn"]
+    assert len(calls) == 2 and not errors
+    assert factory.connections[0].closed and pool.metrics()["connects"] == 2
+
+
+
+def test_saturated_pool_is_not_retried(query_pool):
+    pool, errors = query_pool
+    held = pool.getconn()
+    start = time.perf_counter()
+    assert database.execute_query("SELECT * FROM customer;") is None
+    elapsed = time.perf_counter() - start
+    pool.putconn(held)
+
+    assert pool.metrics()["timeouts"] == 1
+    assert elapsed < 0.2
+    assert len(errors) == 1 and "busy" in errors[0]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from src.model.encoder import EncodedPipeline, FastEncoder
+from tests.conftest import customer_table
+
+
+
+@pytest.fixture
+def features():
+    features = customer_table(200, seed=4).drop(columns=["customer_id", "churn"])
+    # Categories the encoder never saw encode as all zeros:
+    features.loc[::4, "internet_service"] = "Satellite"
+    features.loc[1::5, "gender"] = "Unknown"
+    return features
+
+
+
+def test_every_input_shape_encodes_like_the_preprocessor(churn_pipeline, features):
+    preprocessor = churn_pipeline.named_steps['preprocessor']
+    encoder = FastEncoder(preprocessor)
+    expected = preprocessor.transform(features)
+    records = features.to_dict("records")
+
+    np.testing.assert_array_equal(encoder.transform(features), expected)
+    np.testing.assert_array_equal(encoder.transform(records), expected)
+    np.testing.assert_array_equal(encoder.transform(records[0]), expected[:1])
+
+
+
+def test_encoded_pipeline_matches_the_pipeline(churn_pipeline, features):
+    encoded = EncodedPipeline(churn_pipeline)
+
+    np.testing.assert_array_equal(encoded.predict_proba(features), churn_pipeline.predict_proba(features))
+    np.testing.assert_array_equal(encoded.predict_proba(features.to_dict("records")),
+                                  churn_pipeline.predict_proba(features))
+    assert (encoded.predict(features) == churn_pipeline.predict(features)).all()
+
+
+
+def test_transformers_that_cannot_be_precomputed_are_rejected(features):
+    scaled = ColumnTransformer([('scale', StandardScaler(), ["tenure"])]).fit(features)
+    strict = ColumnTransformer([('encoding', OneHotEncoder(), ["gender"])]).fit(features)
+    for preprocessor in (scaled, strict):
+        with pytest.raises(ValueError):
+            FastEncoder(preprocessor)
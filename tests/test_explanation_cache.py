@@ -0,0 +1,59 @@
+import numpy as np
+from src.explainability.cache import ExplanationCache, explanation_key
+from tests.conftest import customer_table
+
+
+FEATURES = {"contract": "Month-to-month", "tenure": 5, "monthly_charges": 70.35, "senior_citizen": "0"}
+
+
+
+def test_key_ignores_number_types_and_order_but_not_the_model_version():
+    key = explanation_key(FEATURES, "abc123")
+    assert explanation_key(dict(reversed(list(FEATURES.items()))), "abc123") == key
+    assert explanation_key(dict(FEATURES, tenure=np.int64(5)), "abc123") == key
+    assert explanation_key(dict(FEATURES, tenure=5.0), "abc123") == key
+    assert explanation_key(dict(FEATURES, contract="Month-to-month "), "abc123") != key
+    assert explanation_key(FEATURES, "def456") != key
+
+
+
+def test_memory_tier_evicts_the_least_recently_used():
+    cache = ExplanationCache(max_entries=2)
+    cache.put("a", {"prediction": 1})
+    cache.put("b", {"prediction": 0})
+    cache.get("a")
+    cache.put("c", {"prediction": 1})
+
+    assert cache.get("b") is None and cache.get("a") == {"prediction": 1}
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["misses"] == 1 and stats["memory_hits"] == 2
+
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    db_path = str(tmp_path / "explanations.sqlite")
+    ExplanationCache(db_path=db_path).put("a", {"agg_shap": {"tenure": 0.1}})
+
+    cache = ExplanationCache(db_path=db_path)
+    assert cache.get("a") == {"agg_shap": {"tenure": 0.1}}
+    assert cache.stats()["disk_hits"] == 1
+
+
+
+def test_explanations_are_keyed_by_the_loaded_model(tmp_path, churn_pipeline):
+    from ml.retrain import grow_forest
+    from ml.train import save_model, split_target
+    from src.model.registry import get_explainer_context, loaded_model_version, model_version
+
+    path = str(tmp_path / "churn_clf_model.pkl")
+    save_model(churn_pipeline, path)
+    assert loaded_model_version(path) is None
+    context = get_explainer_context(path)
+    loaded = model_version(path)
+    assert context.version == loaded_model_version(path) == loaded
+
+    # A newer model promoted to the same path is not what this process explains with:
+    X, y = split_target(customer_table(100, seed=7))
+    save_model(grow_forest(churn_pipeline, X, y, n_new_trees=2), path)
+    assert model_version(path) != loaded
+    assert get_explainer_context(path).version == loaded_model_version(path) == loaded
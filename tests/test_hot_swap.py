@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from ml.retrain import grow_forest
+from ml.train import promote_model, save_model, split_target
+from src.model.hot_swap import ModelHolder, matching_metadata
+from src.model.registry import metadata_path, model_version
+from tests.conftest import customer_table
+
+
+
+@pytest.fixture
+def model_path(tmp_path, churn_pipeline):
+    """A served model file in a temporary directory, with no metadata next to it."""
+    path = str(tmp_path / "churn_clf_model.pkl")
+    save_model(churn_pipeline, path)
+    return path
+
+
+
+@pytest.fixture
+def new_model(tmp_path, churn_pipeline):
+    """A saved newer model (two more trees) and the metrics promote_model writes for it."""
+    X, y = split_target(customer_table(100, seed=6))
+    path = str(tmp_path / "churn_clf_model_v2.pkl")
+    save_model(grow_forest(churn_pipeline, X, y, n_new_trees=2), path)
+    return path, {"version": "v2", "content_hash": model_version(path)}
+
+
+
+def test_requests_keep_their_version_across_a_swap(model_path, new_model):
+    holder = ModelHolder(model_path, kind="sklearn", poll_interval=0)
+    old_version = holder.current.version
+
+    with holder.use() as served:
+        promote_model(*new_model, model_path=model_path)
+        assert holder.check() is True
+        assert holder.current is not served and served.version == old_version
+        assert holder.current.version == new_model[1]["content_hash"]
+        assert holder.current.metadata["version"] == "v2"
+        assert [old["version"] for old in holder.describe()["draining"]] == [old_version]
+
+        with holder.use() as next_request:
+            assert next_request is holder.current
+
+    assert served.in_flight == 0 and holder.describe()["draining"] == []
+    assert holder.describe()["swaps"] == 1
+    assert holder.check() is False
+
+
+
+def test_metadata_of_another_model_is_not_attached(model_path, new_model):
+    holder = ModelHolder(model_path, kind="sklearn", poll_interval=0)
+    # promote_model has written the new model's metadata, the model itself is not in place yet:
+    with open(metadata_path(model_path), "w") as f:
+        json.dump(new_model[1], f)
+
+    assert matching_metadata(model_path, holder.current.version) == {}
+    assert holder.check() is False
+    assert holder.current.metadata == {}
+
+    with open(metadata_path(model_path), "w") as f:
+        json.dump({"version": "v1", "content_hash": holder.current.version}, f)
+    assert holder.check() is False
+    assert holder.current.metadata["version"] == "v1"
+
+
+
+def test_a_model_that_fails_to_load_is_skipped(model_path, tmp_path):
+    holder = ModelHolder(model_path, kind="sklearn", poll_interval=0)
+    served = holder.current
+    broken = tmp_path / "broken.pkl"
+    broken.write_bytes(b"not a pickle")
+    broken.replace(model_path)
+
+    assert holder.check() is False
+    assert holder.current is served
+    stats = holder.describe()
+    assert stats["failed_loads"] == 1 and stats["swaps"] == 0 and stats["last_error"]
+    # Not retried until the file changes again:
+    assert holder.check() is False and holder.describe()["failed_loads"] == 1
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+import llm.report
+from benchmarks.bench_report_stream import read_sse
+from benchmarks.fake_openai import CANNED_REPORT
+from llm.report import MODEL, RENDER_INTERVAL, build_messages, get_report, stream_report_events
+from llm.report_cache import report_key
+
+
+REQUEST = {
+    "shap_values": {"contract": 0.12, "tenure": 0.08, "internet_service": 0.05, "gender": -0.001},
+    "predictions": "Churn",
+    "prediction_prob": [73.4],
+    "customer_data": {"contract": "Month-to-month", "tenure": 3, "internet_service": "Fibre optic"},
+    "report_type": "Action Plan",
+    "audience": "Management"
+}
+
+
+
+@pytest.fixture
+def openai_server(fake_openai, report_cache, monkeypatch):
+    """
+    Points llm.report's client at a fake OpenAI server started with the given options.
+    """
+    from openai import OpenAI
+
+    def start(**options):
+        app, base_url = fake_openai(**options)
+        monkeypatch.setattr(llm.report, "_client", OpenAI(base_url=base_url, api_key="fake-key", max_retries=0))
+        return app
+
+    return start
+
+
+
+def sse_events(frames):
+    """The (event, data) pairs of the frames stream_report_events yielded."""
+    assert all(frame.endswith("\n\n") for frame in frames), "every frame must end with a blank line"
+    return list(read_sse("".join(frames).split("\n")))
+
+
+
+def test_chunks_are_relayed_then_done(openai_server, report_cache):
+    openai_server()
+    messages = build_messages(**REQUEST)
+    frames = list(stream_report_events(messages))
+    events = sse_events(frames)
+
+    *chunks, (last_event, timing) = events
+    assert [event for event, _ in chunks] == ["message"] * len(chunks)
+    assert "".join(data["delta"] for _, data in chunks) == CANNED_REPORT
+    assert last_event == "done"
+    assert timing["chunks"] == len(chunks) == len(CANNED_REPORT.split(" "))
+    assert timing["cached"] is False
+    assert 0 <= timing["ttft_ms"] <= timing["total_ms"]
+    # The upstream [DONE] sentinel ends the stream and is not relayed:
+    assert not any("[DONE]" in frame for frame in frames)
+    assert report_cache.get(report_key(messages, MODEL)) == CANNED_REPORT
+
+
+
+def test_cached_report_is_one_event_without_a_request(openai_server):
+    app = openai_server()
+    messages = build_messages(**REQUEST)
+    list(stream_report_events(messages))
+
+    events = sse_events(list(stream_report_events(messages)))
+    assert events[0] == ("message", {"delta": CANNED_REPORT})
+    assert events[1][0] == "done" and events[1][1]["cached"] is True and events[1][1]["chunks"] == 1
+    assert len(events) == 2
+    assert app.state.requests == 1
+
+
+
+def test_error_mid_stream_ends_with_an_error_event(openai_server, report_cache):
+    openai_server(fail_after=5)
+    messages = build_messages(**REQUEST)
+    events = sse_events(list(stream_report_events(messages)))
+
+    assert [event for event, _ in events] == ["message"] * 5 + ["error"]
+    assert "server had an error" in events[-1][1]["error"]
+    # An incomplete report is never cached:
+    assert report_cache.get(report_key(messages, MODEL)) is None
+
+
+
+def test_rejected_request_is_a_single_error_event(openai_server):
+    openai_server(rate_limit_ratio=1.0)
+    events = sse_events(list(stream_report_events(build_messages(**REQUEST))))
+
+    assert len(events) == 1
+    assert events[0][0] == "error" and "Rate limit" in events[0][1]["error"]
+
+
+
+class Placeholder:
+    def __init__(self):
+        self.renders = []
+
+    def markdown(self, text):
+        self.renders.append(text)
+
+
+
+def test_get_report_renders_at_most_every_render_interval(openai_server, monkeypatch):
+    openai_server(chunk_delay=0.01)
+    placeholder = Placeholder()
+    fake_st = SimpleNamespace(empty=lambda: placeholder, session_state=SimpleNamespace())
+    monkeypatch.setattr(llm.report, "st", fake_st)
+
+    report = get_report(**REQUEST)
+    timing = fake_st.session_state.report_timing
+    assert report == CANNED_REPORT
+    assert placeholder.renders[-1] == CANNED_REPORT
+    assert timing["chunks"] == len(CANNED_REPORT.split(" "))
+    # One render per RENDER_INTERVAL, plus the first chunk and the final text:
+    assert len(placeholder.renders) <= timing["total_ms"] / 1000 / RENDER_INTERVAL + 2
+    assert len(placeholder.renders) < timing["chunks"]
+
+    placeholder.renders.clear()
+    assert get_report(**REQUEST) == CANNED_REPORT
+    assert placeholder.renders == [CANNED_REPORT]
+    assert fake_st.session_state.report_timing["cached"] is True
@@ -0,0 +1,62 @@
+import copy
+
+import numpy as np
+from ml.retrain import grow_forest
+from ml.train import split_target
+from tests.conftest import customer_table
+
+
+
+def new_batch(n_rows=150, seed=5):
+    return split_target(customer_table(n_rows, seed=seed))
+
+
+
+def test_new_trees_are_added_to_a_copy(churn_pipeline):
+    forest = churn_pipeline.named_steps['model']
+    old_trees = list(forest.estimators_)
+    X, y = new_batch()
+
+    grown = grow_forest(churn_pipeline, X, y, n_new_trees=5)
+    grown_forest = grown.named_steps['model']
+
+    assert len(grown_forest.estimators_) == grown_forest.n_estimators == len(old_trees) + 5
+    assert all(new is old for new, old in zip(grown_forest.estimators_, old_trees))
+    assert grown_forest.warm_start is False
+    # The encoder is shared, the served pipeline is left as it was:
+    assert grown.named_steps['preprocessor'] is churn_pipeline.named_steps['preprocessor']
+    assert forest.estimators_ == old_trees and forest.n_estimators == len(old_trees)
+    assert churn_pipeline.named_steps['model'] is forest
+    assert grown.predict_proba(X).shape == (len(X), 2)
+
+
+
+def test_max_trees_keeps_the_newest_trees(churn_pipeline):
+    old_trees = list(churn_pipeline.named_steps['model'].estimators_)
+    X, y = new_batch()
+
+    grown = grow_forest(churn_pipeline, X, y, n_new_trees=5, max_trees=15)
+    trees = grown.named_steps['model'].estimators_
+
+    assert len(trees) == grown.named_steps['model'].n_estimators == 15
+    assert all(new is old for new, old in zip(trees[:10], old_trees[-10:]))
+    assert not any(tree is old for tree in trees[10:] for old in old_trees)
+
+
+
+def test_new_trees_are_balanced_on_their_batch(churn_pipeline):
+    X, y = new_batch()
+
+    grown = grow_forest(churn_pipeline, X, y, n_new_trees=3)
+
+    assert grown.named_steps['model'].class_weight == 'balanced'
+    assert churn_pipeline.named_steps['model'].class_weight == 'balanced'
+    # The same trees as a forest warm-started with the batch's balanced weights spelled out:
+    n_churned = int(np.sum(y))
+    reference = copy.deepcopy(churn_pipeline.named_steps['model'])
+    reference.set_params(warm_start=True, n_estimators=reference.n_estimators + 3, class_weight={
+        0: len(y) / (2 * (len(y) - n_churned)), 1: len(y) / (2 * n_churned)
+    })
+    reference.fit(churn_pipeline.named_steps['preprocessor'].transform(X), y)
+    for tree, expected in zip(grown.named_steps['model'].estimators_[-3:], reference.estimators_[-3:]):
+        np.testing.assert_allclose(tree.tree_.value, expected.tree_.value)